@@ -0,0 +1,59 @@
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from src.core.config import config
+
+TARGETS = {
+    "api": "import src.api.server",
+    "cli": "import main",
+}
+HEAVY_MODULES = ("langchain_openai", "llama_index", "pinecone", "langgraph", "asyncssh")
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def measure(statement: str):
+    """Importa en un proceso nuevo y devuelve (ms totales, {modulo: ms acumulados})."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT, capture_output=True, text=True, env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    modules = {}
+    for match in _LINE.finditer(result.stderr):
+        modules[match.group(4)] = int(match.group(2)) / 1000
+    top_level = [float(m.group(2)) / 1000 for m in _LINE.finditer(result.stderr) if len(m.group(3)) == 1]
+    return sum(top_level), modules
+
+
+def main():
+    rounds = int(os.getenv("BENCH_ROUNDS", 5))
+    budget = float(os.getenv("STARTUP_BUDGET_MS", config.STARTUP_BUDGET_MS))
+    failed = False
+
+    print(f"{rounds} arranques en frio por objetivo, presupuesto {budget:.0f}ms")
+    for name, statement in TARGETS.items():
+        samples = [measure(statement) for _ in range(rounds)]
+        median = statistics.median(total for total, _ in samples)
+        modules = samples[-1][1]
+        heavy = sorted(m for m in modules if m.split(".")[0] in HEAVY_MODULES)
+        status = "OK" if median <= budget and not heavy else "REGRESION"
+        failed |= status != "OK"
+
+        print(f"  {name:4s}  mediana {median:7.1f}ms  min {min(t for t, _ in samples):7.1f}ms  [{status}]")
+        for module, ms in sorted(modules.items(), key=lambda item: -item[1])[:5]:
+            print(f"        {ms:7.1f}ms  {module}")
+        if heavy:
+            print(f"        importados al arrancar: {', '.join(sorted({m.split('.')[0] for m in heavy}))}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.episode_store import EpisodeStore
+from src.core.fingerprint import signature
+
+SERVICES = ["nginx", "postgresql", "docker", "redis", "ssh"]
+
+
+def episode(i: int) -> dict:
+    service = SERVICES[i % len(SERVICES)]
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "error": f"Servicio '{service}' no esta activo. pid {i}",
+        "service": service,
+        "diagnosis": "El proceso termino inesperadamente; reiniciar el servicio.",
+        "command": f"sudo service {service} restart",
+        "result": f"[sudo service {service} restart] codigo:0",
+        "success": i % 3 != 0
+    }
+
+
+def measure(save, samples: int) -> list:
+    latencies = []
+    for i in range(samples):
+        start = time.perf_counter()
+        save(episode(i))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def legacy_save(path: str, episodes: list):
+    """Escritura anterior: reescribir el JSON completo en cada episodio."""
+    def save(ep):
+        episodes.append(ep)
+        with open(path, "w") as f:
+            json.dump(episodes, f, indent=2, ensure_ascii=False)
+    return save
+
+
+def main():
+    sizes = [int(n) for n in os.getenv("BENCH_SIZES", "100,1000,10000,100000,1000000").split(",")]
+    samples = int(os.getenv("BENCH_SAMPLES", 200))
+    legacy_max = int(os.getenv("BENCH_LEGACY_MAX", 10000))
+    workdir = tempfile.mkdtemp(prefix="sentinel-episodes-")
+
+    print(f"latencia de save_episode ({samples} muestras por tamano)")
+    print(f"  {'episodios':>10s}  {'sqlite p50':>11s}  {'sqlite p99':>11s}  {'json p50':>11s}")
+    try:
+        store = EpisodeStore(os.path.join(workdir, "episodes.sqlite"), signature)
+        stored = 0
+        for size in sizes:
+            store.append_many(episode(i) for i in range(stored, size))
+            stored = size
+            latencies = measure(store.append, samples)
+            stored += samples
+
+            legacy = "-"
+            if size <= legacy_max:
+                history = [episode(i) for i in range(size)]
+                legacy_latencies = measure(legacy_save(os.path.join(workdir, "episodes.json"), history), min(samples, 20))
+                legacy = f"{statistics.median(legacy_latencies):9.3f}ms"
+
+            print(f"  {size:>10d}  {statistics.median(latencies):9.3f}ms  "
+                  f"{sorted(latencies)[int(len(latencies) * 0.99) - 1]:9.3f}ms  {legacy:>11s}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
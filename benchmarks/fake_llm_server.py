@@ -0,0 +1,115 @@
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Tuple
+
+
+class FakeLLMState:
+    """Contadores y limites del servidor falso, compartidos entre peticiones."""
+
+    def __init__(self, latency: float = 0.05, requests_per_second: float = 0, error_rate: float = 0.0):
+        self.latency = latency
+        self.requests_per_second = requests_per_second
+        self.error_rate = error_rate
+        self.lock = threading.Lock()
+        self.window: list = []
+        self.stats = {"calls": 0, "rate_limited": 0, "errors": 0, "concurrent": 0, "max_concurrent": 0}
+
+    def admit(self) -> Tuple[int, Dict[str, str]]:
+        with self.lock:
+            now = time.monotonic()
+            self.window = [t for t in self.window if now - t < 1.0]
+            if self.requests_per_second and len(self.window) >= self.requests_per_second:
+                self.stats["rate_limited"] += 1
+                return 429, {"retry-after": "0.2"}
+            self.window.append(now)
+            if random.random() < self.error_rate:
+                self.stats["errors"] += 1
+                return 503, {}
+            self.stats["calls"] += 1
+            self.stats["concurrent"] += 1
+            self.stats["max_concurrent"] = max(self.stats["max_concurrent"], self.stats["concurrent"])
+            return 200, {}
+
+    def release(self):
+        with self.lock:
+            self.stats["concurrent"] -= 1
+
+
+def _answer(body: Dict) -> str:
+    prompt = body["messages"][-1]["content"]
+    return f"respuesta a: {prompt[:40]}"
+
+
+def _make_handler(state: FakeLLMState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, payload: Dict, headers: Dict[str, str] = None):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            with state.lock:
+                self._send(200, dict(state.stats))
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            status, headers = state.admit()
+            if status != 200:
+                self._send(status, {"error": {"message": "fake error", "type": "rate_limit" if status == 429 else "server"}},
+                           headers)
+                return
+            try:
+                time.sleep(state.latency)
+                text = _answer(body)
+                base = {"id": "chatcmpl-fake", "created": int(time.time()), "model": body.get("model", "fake")}
+                if body.get("stream"):
+                    self._stream(base, text)
+                else:
+                    self._send(200, {
+                        **base,
+                        "object": "chat.completion",
+                        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                        "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20}
+                    })
+            finally:
+                state.release()
+
+        def _stream(self, base: Dict, text: str):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for word in text.split(" "):
+                chunk = {**base, "object": "chat.completion.chunk",
+                         "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.close_connection = True
+
+    return Handler
+
+
+def start_fake_llm_server(latency: float = 0.05, requests_per_second: float = 0, error_rate: float = 0.0):
+    """Servidor local compatible con /v1/chat/completions de OpenAI.
+
+    Devuelve (servidor, estado, base_url). Responde 429 con retry-after al
+    superar 'requests_per_second' y 503 con probabilidad 'error_rate'.
+    """
+    state = FakeLLMState(latency, requests_per_second, error_rate)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state, f"http://127.0.0.1:{server.server_address[1]}/v1"
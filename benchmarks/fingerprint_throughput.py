@@ -0,0 +1,89 @@
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.fingerprint import canonicalize, signature
+
+SERVICES = ["nginx", "postgresql", "docker", "redis", "mysql"]
+# Cada plantilla y servicio es un fallo distinto; los campos variables cambian en cada linea.
+# Las plantillas sin {s}, o con el servicio solo dentro de una ruta, no lo conservan
+# en la firma, asi que se mezclan entre servicios.
+TEMPLATES = [
+    "Servicio '{s}' no esta activo.",
+    "{ts} web1 {s}[{pid}]: bind() to {ip}:{port} failed (98: Address already in use)",
+    "Error de conexion SSH: [Errno 111] Connect call failed ('{ip}', {port})",
+    "{syslog} web1 {s}[{pid}]: open() /var/log/{s}/error-{pid}.log failed (13: Permission denied)",
+    "{s} pid {pid} could not connect to server localhost:{port} after {ms}ms",
+    "container {hex} for {s} exited with status 137",
+    "Out of memory: Killed process {pid} ({s}) total-vm:{kb}kB",
+    "request {uuid} to http://{ip}:{port}/health returned 503 in {ms}ms",
+    "segfault at 0x{addr} ip 0x{addr} sp 0x{addr} error 4 in lib{s}.so",
+    "ssh: connect to host {ip} port {port}: Connection timed out",
+    "Servicio '{s}' degradado: latency_ms={latency} supera el maximo 500; cpu_pct en tendencia: EWMA {ewma} supera 90",
+    "Traceback (most recent call last): File /opt/{s}/app/worker.py:{line} in handle",
+]
+
+_LEGACY_VOLATILE = re.compile(r"0x[0-9a-f]+|\d+")
+_LEGACY_SPACES = re.compile(r"\s+")
+
+
+def legacy_signature(error: str) -> str:
+    """Firma anterior de memory.py: solo colapsaba numeros y hex."""
+    return _LEGACY_SPACES.sub(" ", _LEGACY_VOLATILE.sub("<n>", (error or "").lower())).strip()
+
+
+def line(template: int, service: str, rng: random.Random, now: datetime) -> str:
+    moment = now - timedelta(seconds=rng.randint(0, 86400 * 30))
+    return TEMPLATES[template].format(
+        s=service, pid=rng.randint(100, 99999), port=rng.randint(1024, 65535),
+        ip=".".join(str(rng.randint(1, 254)) for _ in range(4)), ts=moment.isoformat(),
+        syslog=moment.strftime("%b %d %H:%M:%S"), ms=rng.randint(5, 30000), kb=rng.randint(10 ** 5, 10 ** 7),
+        hex="%012x" % rng.getrandbits(48), uuid="%08x-%04x-%04x-%04x-%012x" % tuple(rng.getrandbits(b) for b in (32, 16, 16, 16, 48)),
+        addr="%x" % rng.getrandbits(40), latency=rng.choice([rng.randint(501, 999), round(rng.uniform(500, 2000), 1)]),
+        ewma=round(rng.uniform(90, 100), rng.randint(0, 2)), line=rng.randint(1, 900),
+    )
+
+
+def throughput(fn, lines: list) -> float:
+    start = time.perf_counter()
+    for text in lines:
+        fn(text)
+    return len(lines) / (time.perf_counter() - start)
+
+
+def main():
+    count = int(os.getenv("BENCH_LINES", 200000))
+    rng = random.Random(3)
+    now = datetime.now()
+    labelled = []
+    for i in range(count):
+        template, service = i % len(TEMPLATES), rng.choice(SERVICES)
+        labelled.append(((template, service), line(template, service, rng, now)))
+    lines = [text for _, text in labelled]
+    failures = len({label for label, _ in labelled})
+
+    print(f"huella de errores sobre {count} lineas de {failures} fallos distintos (plantilla x servicio)")
+    canonicalize.cache_clear()
+    signature.cache_clear()
+    print(f"  canonicalize sin cache   {throughput(canonicalize.__wrapped__, lines):>10,.0f} lineas/s")
+    print(f"  signature (lineas unicas) {throughput(signature, lines):>9,.0f} lineas/s")
+    repeated = [lines[i % 500] for i in range(count)]
+    print(f"  signature (servicio en bucle, 500 lineas) {throughput(signature, repeated):>9,.0f} lineas/s")
+    print(f"  firma anterior           {throughput(legacy_signature, lines):>10,.0f} lineas/s")
+
+    for name, fn in (("firma anterior", legacy_signature), ("fingerprint", signature)):
+        groups = {}
+        for label, text in labelled:
+            groups.setdefault(fn(text), set()).add(label)
+        mixed = sum(1 for labels in groups.values() if len(labels) > 1)
+        print(f"  {name:<15s} {len(groups):>7d} firmas distintas para {failures} fallos"
+              f" ({len(groups) / failures:.1f} por fallo, {mixed} mezclan fallos)")
+
+
+if __name__ == "__main__":
+    main()
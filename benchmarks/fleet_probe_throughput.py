@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.standin_sshd import spawn_standin_servers, STANDIN_PASSWORD
+from src.core.config import config
+from src.tools.async_ssh import ssh_runtime
+from src.tools.fleet import FleetScheduler, build_status_view
+
+SERVICES = {
+    f"svc{i}": {
+        "check_command": f"echo ' * svc{i} is running'",
+        "running_indicator": "is running",
+        "type": "custom"
+    }
+    for i in range(int(os.getenv("BENCH_SERVICES", 10)))
+}
+
+
+def main():
+    host_counts = [int(n) for n in os.getenv("BENCH_HOSTS", "1,2,4,8,16,32").split(",")]
+    rounds = int(os.getenv("BENCH_ROUNDS", 5))
+    latency_ms = int(os.getenv("BENCH_LATENCY_MS", 50))
+    server, ports = spawn_standin_servers(max(host_counts), latency=latency_ms / 1000)
+
+    print(f"{len(SERVICES)} servicios por host, {rounds} rondas, RTT simulado {latency_ms}ms")
+    for count in host_counts:
+        config.HOSTS = {
+            f"host{i}": {
+                "hostname": "127.0.0.1",
+                "port": port,
+                "username": "sentinel",
+                "password": STANDIN_PASSWORD,
+                "services": SERVICES
+            }
+            for i, port in enumerate(ports[:count])
+        }
+        scheduler = FleetScheduler(max_workers=config.FLEET_MAX_WORKERS, host_rate=0)
+        ssh_runtime.run(scheduler.probe_all())
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            view, failures = build_status_view(ssh_runtime.run(scheduler.probe_all()))
+        elapsed = time.perf_counter() - start
+
+        probes = count * len(SERVICES) * rounds
+        print(f"  hosts={count:3d}  {probes / elapsed:8.1f} sondeos/s  "
+              f"{elapsed / rounds * 1000:7.1f} ms/ronda  fallos={len(failures)}")
+
+    ssh_runtime.shutdown()
+    server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import os
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+WORKDIR = tempfile.mkdtemp(prefix="sentinel-bench-")
+os.environ.update({
+    "DATA_DIR": WORKDIR,
+    "SENTINEL_PROVIDER": "fake",
+    "OPENAI_API_KEY": "fake",
+    "LLM_CACHE_ENABLED": "false",
+    "LLM_REQUESTS_PER_MINUTE": "0",
+    "LLM_TOKENS_PER_MINUTE": "0",
+    "PLAYBOOK_ENABLED": os.getenv("BENCH_PLAYBOOK", "false"),
+})
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.runnables import RunnableLambda
+from benchmarks.standin_sshd import spawn_standin_servers, STANDIN_PASSWORD
+from src.core import knowledge
+from src.core.config import config
+from src.core.fakes import FakeChatModel, default_responder
+from src.core.llm import llm_client
+from src.core.tracing import tracer
+
+SCENARIOS = ("success", "retry", "escalation", "approval")
+STATE_DIR = os.path.join(WORKDIR, "services")
+NODES = {"remediate", "playbook", "diagnose", "plan", "approval", "wait_approval", "execute", "verify", "report", "escalation"}
+_SERVICE = re.compile(r"Servicio afectado: (\S+)")
+_ATTEMPT = re.compile(r"Intento: (\d+)")
+
+MANUAL = """# Recuperacion de servicios
+
+Si el servicio no responde, comprobar el fichero de estado y volver a crearlo.
+Un reinicio del servicio suele resolver bloqueos temporales del proceso.
+
+# Bloqueos
+
+Cuando existe un fichero de bloqueo hay que vaciarlo antes de arrancar de nuevo.
+"""
+
+
+def plan_responder(messages) -> str:
+    """Comandos por escenario: el estado del servicio es un fichero en STATE_DIR."""
+    prompt = "\n".join(content for _, content in messages)
+    service = _SERVICE.search(prompt)
+    if "comandos de shell" not in prompt or not service:
+        return default_responder(messages)
+    name = service.group(1)
+    attempt = int(_ATTEMPT.search(prompt).group(1))
+    marker = os.path.join(STATE_DIR, f"{name}.up")
+    if name == "escalation" or (name == "retry" and attempt == 1):
+        return "true"
+    if name == "approval":
+        return f"truncate -s 0 {marker}"
+    return f"touch {marker}"
+
+
+class NodeTimer(BaseCallbackHandler):
+    """Mide la duracion de cada nodo del grafo a partir de los callbacks de LangGraph."""
+
+    def __init__(self):
+        self.started: Dict = {}
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    def on_chain_start(self, serialized, inputs, *, run_id, name=None, **kwargs):
+        if name in NODES:
+            self.started[run_id] = (name, time.perf_counter())
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        started = self.started.pop(run_id, None)
+        if started:
+            self.samples[started[0]].append((time.perf_counter() - started[1]) * 1000)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self.on_chain_end(None, run_id=run_id)
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def run_cycle(app, resume_pipeline, scenario: str, timer: NodeTimer) -> Dict:
+    marker = os.path.join(STATE_DIR, f"{scenario}.up")
+    if os.path.exists(marker):
+        os.remove(marker)
+    state = {"current_error": f"{scenario} is not running", "affected_service": scenario, "affected_host": "bench"}
+    result = app.invoke(state, {"callbacks": [timer]})
+    remediation = result["remediations"][0]
+    if remediation.get("approval_status") == "WAITING_APPROVAL":
+        resume = RunnableLambda(lambda run_id: resume_pipeline(run_id, "APPROVED"), name="resume")
+        remediation = resume.invoke(remediation["run_id"], {"callbacks": [timer]})
+    return remediation
+
+
+def main():
+    cycles = int(os.getenv("BENCH_CYCLES", 20))
+    config.MAX_RETRIES = int(os.getenv("BENCH_MAX_RETRIES", 2))
+    llm_client.model_factory = lambda model=FakeChatModel(plan_responder): model
+
+    os.makedirs(STATE_DIR, exist_ok=True)
+    server, ports = spawn_standin_servers(1)
+    check = "test -f {dir}/{name}.up && echo running || echo stopped"
+    config.HOSTS = {
+        "bench": {
+            "hostname": "127.0.0.1",
+            "port": ports[0],
+            "username": "sentinel",
+            "password": STANDIN_PASSWORD,
+            "services": {
+                name: {"check_command": check.format(dir=STATE_DIR, name=name), "running_indicator": "running",
+                       "type": "custom"}
+                for name in SCENARIOS
+            }
+        }
+    }
+
+    manual = os.path.join(WORKDIR, "manual.md")
+    with open(manual, "w") as f:
+        f.write(MANUAL)
+    knowledge.kb = knowledge.VectorKnowledgeBase()
+    knowledge.kb.ingest_file(manual)
+
+    from src.agent.graph import app, resume_pipeline
+    from src.tools.async_ssh import ssh_runtime
+
+    print(f"{cycles} ciclos por escenario, MAX_RETRIES={config.MAX_RETRIES}, proveedor falso, SSH local")
+    run_cycle(app, resume_pipeline, "success", NodeTimer())
+    for scenario in SCENARIOS:
+        timer = NodeTimer()
+        outcomes = defaultdict(int)
+        start = time.perf_counter()
+        for _ in range(cycles):
+            outcomes[run_cycle(app, resume_pipeline, scenario, timer).get("current_step")] += 1
+        elapsed = time.perf_counter() - start
+
+        print(f"\n  {scenario:10s} {cycles / elapsed:7.2f} ciclos/s  {elapsed / cycles * 1000:7.1f} ms/ciclo  "
+              f"resultado {dict(outcomes)}")
+        for node, samples in sorted(timer.samples.items(), key=lambda item: -statistics.mean(item[1])):
+            print(f"      {node:14s} n={len(samples):4d}  p50 {percentile(samples, 0.5):7.2f}  "
+                  f"p95 {percentile(samples, 0.95):7.2f}  p99 {percentile(samples, 0.99):7.2f} ms")
+
+    print("\n  dependencias (todos los escenarios):")
+    for name, summary in tracer.export()["dependencies"].items():
+        print(f"      {name:14s} n={summary['count']:4d}  p50 {summary['p50']:7.2f}  "
+              f"p95 {summary['p95']:7.2f}  p99 {summary['p99']:7.2f} ms")
+
+    ssh_runtime.shutdown()
+    server.terminate()
+    shutil.rmtree(WORKDIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("OPENAI_API_KEY", "fake")
+
+from benchmarks.fake_llm_server import start_fake_llm_server
+from src.core.config import config
+from src.core.llm import LLMClient
+from src.core.llm_cache import llm_cache
+
+
+def main():
+    requests = int(os.getenv("BENCH_REQUESTS", 200))
+    clients = int(os.getenv("BENCH_CLIENTS", 32))
+    distinct = int(os.getenv("BENCH_DISTINCT", 50))
+    latency_ms = int(os.getenv("BENCH_LATENCY_MS", 100))
+    server_rps = float(os.getenv("BENCH_SERVER_RPS", 40))
+    error_rate = float(os.getenv("BENCH_ERROR_RATE", 0.05))
+
+    server, state, base_url = start_fake_llm_server(latency_ms / 1000, server_rps, error_rate)
+    config.LLM_BASE_URL = base_url
+    llm_cache.enabled = False
+
+    from langchain_openai import ChatOpenAI
+    model = ChatOpenAI(model=config.MODEL_NAME, base_url=base_url, max_retries=0, timeout=10)
+    client = LLMClient(
+        model_factory=lambda: model,
+        max_concurrency=config.LLM_MAX_CONCURRENCY,
+        requests_per_minute=float(os.getenv("BENCH_CLIENT_RPM", server_rps * 60 * 0.9)),
+        tokens_per_minute=0,
+        max_retries=config.LLM_MAX_RETRIES,
+        retry_base_delay=0.1,
+        retry_max_delay=2
+    )
+
+    print(f"{requests} peticiones ({distinct} distintas) desde {clients} hilos, servidor a {server_rps:g} req/s, "
+          f"latencia {latency_ms}ms, errores {error_rate:.0%}")
+    prompts = [[("human", f"incidente {i % distinct}")] for i in range(requests)]
+    start = time.perf_counter()
+    failures = 0
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        for future in [pool.submit(client.complete, p) for p in prompts]:
+            try:
+                future.result()
+            except Exception:
+                failures += 1
+    elapsed = time.perf_counter() - start
+
+    stats = client.stats()
+    print(f"  {requests / elapsed:8.1f} peticiones/s  {elapsed:6.2f}s  fallidas={failures}")
+    print(f"  llamadas al servidor={state.stats['calls']}  unidas={stats['coalesced']}  reintentos={stats['retries']}  "
+          f"429={state.stats['rate_limited']}  503={state.stats['errors']}  concurrencia max={state.stats['max_concurrent']}")
+    print(f"  latencia p50={stats['latency_ms']['p50']}ms p95={stats['latency_ms']['p95']}ms  "
+          f"cola p50={stats['queue_ms']['p50']}ms p95={stats['queue_ms']['p95']}ms")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
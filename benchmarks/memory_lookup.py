@@ -0,0 +1,134 @@
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+WORKDIR = tempfile.mkdtemp(prefix="sentinel-memory-")
+os.environ["DATA_DIR"] = WORKDIR
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.episode_index import keywords
+from src.core.fingerprint import signature
+from src.core.memory import AgentMemory
+
+SERVICES = ["nginx", "postgresql", "docker", "redis", "ssh", "cron", "mysql", "rabbitmq"]
+TEMPLATES = [
+    "Servicio '{s}' no esta activo.",
+    "{s}: bind() to 0.0.0.0:80 failed (98: Address already in use)",
+    "{s} could not connect to server: Connection refused",
+    "Host inalcanzable al sondear {s}: timeout",
+    "{s} dpkg was interrupted, you must manually run dpkg --configure -a",
+    "{s} permission denied on /var/run/{s}.pid",
+]
+QUERIES = [
+    "Servicio 'nginx' no esta activo.",
+    "nginx bind failed Address already in use",
+    "could not connect to server",
+    "redis timeout",
+    "disk full on /var",
+]
+
+
+def episode(i: int, rng: random.Random) -> dict:
+    service = rng.choice(SERVICES)
+    return {
+        "timestamp": f"2026-01-01T00:00:{i % 60:02d}",
+        "error": rng.choice(TEMPLATES).format(s=service),
+        "service": service,
+        "diagnosis": "",
+        "command": rng.choice([f"sudo service {service} restart", f"sudo service {service} start", "sudo dpkg --configure -a"]),
+        "result": "",
+        "success": rng.random() < 0.6
+    }
+
+
+def legacy_find_similar(rollups, error):
+    """Recorrido original: solapamiento de palabras separadas por espacios, sin firma."""
+    error_keywords = set(error.lower().split())
+    best_match, best_score = None, 0
+    for ep in reversed(rollups):
+        overlap = len(error_keywords & set(ep["error"].lower().split()))
+        if overlap > best_score:
+            best_score, best_match = overlap, ep
+    return best_match if best_match and best_score >= 2 else None
+
+
+def legacy_failed_commands(rollups, error):
+    error_keywords = set(error.lower().split())
+    return {ep["command"] for ep in rollups
+            if ep["failures"] and error_keywords & set(ep.get("error", "").lower().split())}
+
+
+def scan_find_similar(rollups, error):
+    """Recorrido completo con las reglas actuales (firma y luego palabras clave), para validar el indice.
+
+    Sus resultados difieren a proposito de legacy_find_similar: la firma y la
+    forma canonica cambian que episodio se considera el mismo error.
+    """
+    for ep in reversed(rollups):
+        if ep["signature"] == signature(error):
+            return ep
+    error_keywords = keywords(error)
+    best_match, best_score = None, 0
+    for ep in reversed(rollups):
+        overlap = len(error_keywords & keywords(ep["error"]))
+        if overlap > best_score:
+            best_score, best_match = overlap, ep
+    return best_match if best_match and best_score >= 2 else None
+
+
+def scan_failed_commands(rollups, error):
+    error_keywords = keywords(error)
+    return {ep["command"] for ep in rollups
+            if ep["failures"] and error_keywords & keywords(ep.get("error"))}
+
+
+def timed(fn, *args, repeat: int = 20) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    sizes = [int(n) for n in os.getenv("BENCH_SIZES", "1000,10000,100000,1000000").split(",")]
+    legacy_max = int(os.getenv("BENCH_LEGACY_MAX", 100000))
+    rng = random.Random(7)
+    memory = AgentMemory()
+    stored = 0
+
+    print("find_similar / get_failed_commands: indice invertido frente al recorrido completo original de los rollups")
+    try:
+        for size in sizes:
+            memory.store.append_many(episode(i, rng) for i in range(stored, size))
+            stored = size
+            start = time.perf_counter()
+            rollups = sorted(memory.rollups, key=lambda rollup: rollup["episode_id"])
+            load = (time.perf_counter() - start) * 1000
+
+            similar = statistics.mean(timed(memory.find_similar, q) for q in QUERIES)
+            failed = statistics.mean(timed(memory.get_failed_commands, q) for q in QUERIES)
+            line = f"  {size:>8d} episodios ({len(rollups):>5d} rollups)  carga {load:8.1f}ms  similar {similar:7.3f}ms  fallidos {failed:7.3f}ms"
+
+            if size <= legacy_max:
+                same = 0
+                for query in QUERIES:
+                    assert memory.find_similar(query) == scan_find_similar(rollups, query), query
+                    assert set(memory.get_failed_commands(query)) == scan_failed_commands(rollups, query), query
+                    same += (memory.find_similar(query) == legacy_find_similar(rollups, query)
+                             and set(memory.get_failed_commands(query)) == legacy_failed_commands(rollups, query))
+                legacy = statistics.mean(timed(legacy_find_similar, rollups, q, repeat=3) for q in QUERIES)
+                line += (f"  | recorrido original {legacy:8.2f}ms  indice = recorrido actual,"
+                         f" {same}/{len(QUERIES)} consultas iguales al original")
+            print(line)
+    finally:
+        shutil.rmtree(WORKDIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+WORKDIR = tempfile.mkdtemp(prefix="sentinel-retrieval-")
+os.environ["DATA_DIR"] = WORKDIR
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.memory import AgentMemory
+
+SERVICES = ["nginx", "postgresql", "docker", "redis", "mysql", "rabbitmq"]
+
+# causa -> (parafrasis del error, comando que lo arregla, comandos que no)
+# La ultima parafrasis de cada causa no se guarda nunca: solo se usa como consulta.
+CAUSES = {
+    "puerto": ([
+        "{s}: bind() to 0.0.0.0:{n} failed (98: Address already in use)",
+        "{s} cannot listen on port {n}: address already in use",
+        "Error starting {s}: port {n} is already allocated",
+        "{s} failed to bind port {n}, address in use by another process",
+    ], "sudo fuser -k {n}/tcp && sudo service {s} start", ["sudo service {s} restart", "sudo systemctl reload {s}"]),
+    "inactivo": ([
+        "Servicio '{s}' no esta activo.",
+        "{s}.service: Main process exited, code=exited, status=1/FAILURE",
+        "Unit {s}.service entered failed state",
+        "{s} service is not running (inactive)",
+    ], "sudo service {s} start", ["sudo systemctl reload {s}"]),
+    "rechazada": ([
+        "{s} could not connect to server: Connection refused",
+        "connect() to 127.0.0.1:{n} failed (111: Connection refused)",
+        "dial tcp 127.0.0.1:{n}: connect: connection refused",
+        "{s}: upstream connection refused on 127.0.0.1:{n}",
+    ], "sudo service {s} restart", ["sudo ufw allow {n}"]),
+    "disco": ([
+        "No space left on device writing /var/lib/{s}/data",
+        "{s}: write error: disk full",
+        "could not extend file: No space left on device",
+        "ENOSPC: no space left on device, write /var/lib/{s}",
+    ], "sudo journalctl --vacuum-size=200M", ["sudo service {s} restart", "sudo apt-get clean"]),
+    "permisos": ([
+        "{s} permission denied on /var/run/{s}.pid",
+        "open() /var/log/{s}/error.log failed (13: Permission denied)",
+        "{s}: EACCES: permission denied, open /etc/{s}/{s}.conf",
+        "Permission denied while opening /var/log/{s}/access.log",
+    ], "sudo chown -R {s}:{s} /var/log/{s}", ["sudo chmod 777 /var/run", "sudo service {s} restart"]),
+    "dpkg": ([
+        "dpkg was interrupted, you must manually run 'dpkg --configure -a'",
+        "E: Could not get lock /var/lib/dpkg/lock-frontend",
+        "E: Unable to acquire the dpkg frontend lock, is another process using it?",
+        "apt-get install {s} failed: could not get dpkg lock",
+    ], "sudo dpkg --configure -a", ["sudo apt-get install -f {s}"]),
+    "config": ([
+        "{s}: configuration file /etc/{s}/{s}.conf test failed",
+        "syntax error in /etc/{s}/{s}.conf at line {n}",
+        "Job for {s}.service failed: invalid directive in configuration",
+        "{s} refused to start: configuration file syntax error on line {n}",
+    ], "sudo cp /etc/{s}/{s}.conf.bak /etc/{s}/{s}.conf", ["sudo service {s} restart", "sudo systemctl daemon-reload"]),
+    "memoria": ([
+        "Out of memory: Killed process {n} ({s})",
+        "{s} was killed by the OOM killer",
+        "fork: Cannot allocate memory while starting {s}",
+        "{s} process {n} killed: out of memory",
+    ], "sudo sysctl -w vm.overcommit_memory=1", ["sudo service {s} restart"]),
+    "dns": ([
+        "Temporary failure in name resolution for {s}.internal",
+        "{s}: could not resolve host {s}.internal",
+        "getaddrinfo ENOTFOUND {s}.internal",
+        "{s}.internal: Name or service not known, resolution failed",
+    ], "sudo systemctl restart systemd-resolved", ["sudo service {s} restart"]),
+    "timeout": ([
+        "Host inalcanzable al sondear {s}: timeout",
+        "{s} health check timed out after {n}ms",
+        "connection to {s} timed out after {n}ms",
+        "{s}: operation timed out waiting for health check",
+    ], "sudo ip link set eth0 up", ["sudo service {s} restart"]),
+}
+
+COMMAND_CAUSES = {}
+for _cause, (_, _fix, _wrong) in CAUSES.items():
+    for _command in [_fix] + _wrong:
+        COMMAND_CAUSES.setdefault(_command, set()).add(_cause)
+
+
+def render(template: str, service: str, n: int) -> str:
+    return template.format(s=service, n=n)
+
+
+def episode(i: int, rng: random.Random, now: datetime) -> dict:
+    cause = rng.choice(list(CAUSES))
+    variants, fix, wrong = CAUSES[cause]
+    service = rng.choice(SERVICES)
+    n = rng.randint(80, 9999)
+    fixes = rng.random() < 0.5
+    command = fix if fixes else rng.choice(wrong)
+    return {
+        "timestamp": (now - timedelta(minutes=rng.randint(0, 90 * 24 * 60))).isoformat(),
+        "error": render(rng.choice(variants[:-1]), service, n),
+        "service": service,
+        "diagnosis": cause,
+        "command": render(command, service, n),
+        "result": "",
+        "success": rng.random() < (0.85 if fixes else 0.1)
+    }
+
+
+def queries(rng: random.Random, count: int) -> list:
+    """(error, causa, parafrasis_nueva): mitad con textos vistos, mitad con la parafrasis reservada."""
+    result = []
+    for i in range(count):
+        cause = rng.choice(list(CAUSES))
+        variants = CAUSES[cause][0]
+        held_out = i % 2 == 0
+        template = variants[-1] if held_out else rng.choice(variants[:-1])
+        result.append((render(template, rng.choice(SERVICES), rng.randint(80, 9999)), cause, held_out))
+    return result
+
+
+def command_cause_matches(command: str, cause: str) -> bool:
+    for template, causes in COMMAND_CAUSES.items():
+        if cause in causes and command_shape(template) == command_shape(command):
+            return True
+    return False
+
+
+def command_shape(command: str) -> str:
+    for service in SERVICES:
+        command = command.replace(service, "{s}")
+    return "".join("{n}" if part.isdigit() else part for part in _split_digits(command))
+
+
+def _split_digits(text: str) -> list:
+    parts, current = [], ""
+    for char in text:
+        if current and char.isdigit() != current[-1].isdigit():
+            parts.append(current)
+            current = ""
+        current += char
+    return parts + [current] if current else parts
+
+
+def evaluate(memory: AgentMemory, cases: list) -> dict:
+    similar = {True: [0, 0, 0], False: [0, 0, 0]}
+    failed_precision, failed_sizes, failed_latency, similar_latency = [], [], [], []
+    for error, cause, held_out in cases:
+        start = time.perf_counter()
+        match = memory.find_similar(error)
+        similar_latency.append((time.perf_counter() - start) * 1000)
+        bucket = similar[held_out]
+        bucket[0] += 1
+        if match is not None:
+            bucket[1] += 1
+            bucket[2] += match["diagnosis"] == cause
+
+        start = time.perf_counter()
+        commands = memory.get_failed_commands(error)
+        failed_latency.append((time.perf_counter() - start) * 1000)
+        failed_sizes.append(len(commands))
+        if commands:
+            failed_precision.append(sum(command_cause_matches(c, cause) for c in commands) / len(commands))
+    return {
+        "similar": similar,
+        "failed_precision": statistics.mean(failed_precision) if failed_precision else 0.0,
+        "failed_size": statistics.mean(failed_sizes),
+        "similar_ms": statistics.median(similar_latency),
+        "failed_ms": statistics.median(failed_latency),
+    }
+
+
+def describe(name: str, result: dict) -> str:
+    parts = []
+    for held_out, label in ((False, "vistos"), (True, "parafrasis")):
+        total, answered, correct = result["similar"][held_out]
+        precision = correct / answered if answered else 0.0
+        parts.append(f"{label} prec {precision:5.1%} cobertura {answered / total:5.1%}")
+    return (f"    {name:<9s} similar: {'  '.join(parts)}  {result['similar_ms']:7.3f}ms\n"
+            f"    {'':<9s} fallidos: precision {result['failed_precision']:5.1%}  "
+            f"{result['failed_size']:5.1f} comandos/consulta  {result['failed_ms']:7.3f}ms")
+
+
+def main():
+    sizes = [int(n) for n in os.getenv("BENCH_SIZES", "1000,10000,100000").split(",")]
+    query_count = int(os.getenv("BENCH_QUERIES", 200))
+    rng = random.Random(11)
+    now = datetime.now()
+    cases = queries(random.Random(5), query_count)
+
+    keyword = AgentMemory()
+    semantic = AgentMemory()
+    semantic.semantic = True
+    stored = 0
+
+    print(f"recuperacion de episodios: palabras clave frente a vectores ({query_count} consultas)")
+    try:
+        for size in sizes:
+            keyword.store.append_many(episode(i, rng, now) for i in range(stored, size))
+            stored = size
+            for memory in (keyword, semantic):
+                start = time.perf_counter()
+                memory.rollups
+                memory.load_ms = (time.perf_counter() - start) * 1000
+            print(f"  {size} episodios (carga: palabras {keyword.load_ms:.0f}ms, vectores {semantic.load_ms:.0f}ms)")
+            print(describe("palabras", evaluate(keyword, cases)))
+            print(describe("vectores", evaluate(semantic, cases)))
+    finally:
+        shutil.rmtree(WORKDIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.config import config
+from src.tools.async_ssh import AsyncSSHClient, ssh_runtime, execute
+
+
+async def legacy_execute(ssh: AsyncSSHClient, command: str):
+    """Espera de antes: comprobar el estado de salida cada 0.5s en lugar de esperar al canal."""
+    process = await ssh.conn.create_process(command)
+    while process.exit_status is None:
+        await asyncio.sleep(0.5)
+    out, err = await process.stdout.read(), await process.stderr.read()
+    return process.exit_status, out.strip(), err.strip()
+
+
+def measure(fn, runs: int):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else "service ssh status"
+    runs = int(os.getenv("BENCH_RUNS", 20))
+    target = {"hostname": config.SSH_HOST, "port": config.SSH_PORT, "username": config.SSH_USER,
+              "password": config.SSH_PASS}
+    server = None
+    if os.getenv("BENCH_STANDIN", "0") == "1":
+        from benchmarks.standin_sshd import spawn_standin_servers, STANDIN_PASSWORD
+        server, ports = spawn_standin_servers(1, latency=int(os.getenv("BENCH_LATENCY_MS", 0)) / 1000)
+        target = {"hostname": "127.0.0.1", "port": ports[0], "username": "sentinel", "password": STANDIN_PASSWORD}
+
+    ssh = AsyncSSHClient(**target)
+    ssh_runtime.run(ssh.connect())
+    try:
+        ssh_runtime.run(execute(command, **target))
+        legacy = measure(lambda: ssh_runtime.run(legacy_execute(ssh, command)), runs)
+        current = measure(lambda: ssh_runtime.run(execute(command, **target)), runs)
+    finally:
+        ssh_runtime.run(ssh.close())
+        ssh_runtime.shutdown()
+        if server is not None:
+            server.terminate()
+
+    print(f"Comando: {command} ({runs} ejecuciones)")
+    print(f"  sleep-polling (0.5s):    p50={legacy[0]:.1f}ms max={legacy[1]:.1f}ms")
+    print(f"  pool asyncssh (nodos):   p50={current[0]:.1f}ms max={current[1]:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
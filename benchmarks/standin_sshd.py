@@ -0,0 +1,85 @@
+import asyncio
+from typing import List
+import asyncssh
+
+STANDIN_PASSWORD = "sentinel"
+
+
+class _StandinServer(asyncssh.SSHServer):
+    def begin_auth(self, username: str) -> bool:
+        return True
+
+    def password_auth_supported(self) -> bool:
+        return True
+
+    def validate_password(self, username: str, password: str) -> bool:
+        return password == STANDIN_PASSWORD
+
+
+async def _pump(src, dst):
+    while True:
+        data = await src.read(65536)
+        if not data:
+            break
+        dst.write(data)
+
+
+async def _feed(src, dst):
+    while True:
+        data = await src.read(1024)
+        if not data:
+            break
+        dst.write(data)
+    dst.close()
+
+
+def _make_handler(latency: float):
+    async def handle(process):
+        if latency:
+            await asyncio.sleep(latency)
+        await _run(process)
+    return handle
+
+
+async def _run(process):
+    proc = await asyncio.create_subprocess_exec(
+        "bash", "-c", process.command or "true",
+        stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    feeder = asyncio.ensure_future(_feed(process.stdin, proc.stdin))
+    await asyncio.gather(_pump(proc.stdout, process.stdout), _pump(proc.stderr, process.stderr))
+    code = await proc.wait()
+    feeder.cancel()
+    process.exit(code)
+
+
+async def start_standin_servers(count: int, host: str = "127.0.0.1", latency: float = 0.0) -> List[int]:
+    """Levanta `count` servidores SSH locales que ejecutan los comandos con bash.
+
+    `latency` simula el RTT de red (segundos) antes de cada comando.
+    """
+    key = asyncssh.generate_private_key("ssh-ed25519")
+    ports = []
+    for _ in range(count):
+        server = await asyncssh.create_server(
+            _StandinServer, host, 0,
+            server_host_keys=[key], process_factory=_make_handler(latency), encoding=None
+        )
+        ports.append(server.sockets[0].getsockname()[1])
+    return ports
+
+
+def _serve(count: int, latency: float, conn):
+    async def run():
+        conn.send(await start_standin_servers(count, latency=latency))
+        await asyncio.Event().wait()
+    asyncio.run(run())
+
+
+def spawn_standin_servers(count: int, latency: float = 0.0):
+    """Igual que start_standin_servers pero en un proceso aparte; devuelve (proceso, puertos)."""
+    import multiprocessing
+    parent, child = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=_serve, args=(count, latency, child), daemon=True)
+    process.start()
+    return process, parent.recv()
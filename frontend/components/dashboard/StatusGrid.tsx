@@ -1,5 +1,5 @@
 import { StatusResponse } from "@/lib/api";
-import { CheckCircle2, XCircle, Clock, Globe, Database, Terminal } from "lucide-react";
+import { CheckCircle2, XCircle, AlertTriangle, Clock, Globe, Database, Terminal } from "lucide-react";
 
 interface StatusGridProps {
     services: StatusResponse | null;
@@ -9,6 +9,7 @@ export function StatusGrid({ services }: StatusGridProps) {
     const getStatusColor = (status: string) => {
         switch (status) {
             case 'running': return 'bg-green-500/10 text-green-500 border-green-500/20';
+            case 'degraded': return 'bg-yellow-500/10 text-yellow-500 border-yellow-500/20';
             case 'stopped': return 'bg-red-500/10 text-red-500 border-red-500/20';
             case 'error': return 'bg-red-500/10 text-red-500 border-red-500/20';
             default: return 'bg-gray-500/10 text-gray-400 border-gray-500/20';
@@ -18,6 +19,7 @@ export function StatusGrid({ services }: StatusGridProps) {
     const getStatusIcon = (status: string) => {
         switch (status) {
             case 'running': return <CheckCircle2 className="w-4 h-4" />;
+            case 'degraded': return <AlertTriangle className="w-4 h-4" />;
             case 'stopped': return <XCircle className="w-4 h-4" />;
             case 'error': return <XCircle className="w-4 h-4" />;
             default: return <Clock className="w-4 h-4" />;
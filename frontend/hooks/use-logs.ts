@@ -34,6 +34,8 @@ export function useLogs() {
             socket.onmessage = (event) => {
                 try {
                     const data = JSON.parse(event.data);
+                    // Spans are structured tracing data (see /traces), not log lines
+                    if (data.type === 'span') return;
                     if (mounted) {
                         setLogs(prev => {
                             const newLogs = [...prev, data];
@@ -3,7 +3,7 @@ import axios from 'axios';
 export const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
 
 export interface ServiceStatus {
-    status: 'running' | 'stopped' | 'error';
+    status: 'running' | 'degraded' | 'stopped' | 'error';
     details: string;
     type: string;
 }
@@ -17,6 +17,14 @@ export interface Episode {
     command: string;
     result: string;
     success: boolean;
+    service?: string | null;
+    signature?: string;
+    count?: number;
+    successes?: number;
+    failures?: number;
+    success_rate?: number;
+    first_seen?: string;
+    last_seen?: string;
 }
 
 export interface AgentState {
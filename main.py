@@ -3,32 +3,50 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-from src.agent.graph import app
+from src.agent.runs import runs
+from src.agent.scheduler import MonitorScheduler
 from src.core.config import config
 from src.core.event_bus import log
+from src.tools.async_ssh import ssh_runtime
+from src.tools.fleet import fleet, build_status_view, status_key
 
 
-def run_cycle():
-    initial_state = {
-        "messages": [],
-        "current_step": "start",
-        "current_error": None,
-        "affected_service": None,
-        "diagnosis_log": [],
-        "candidate_plan": None,
-        "approval_status": "PENDING",
-        "retry_count": 0,
-        "memory_consulted": False,
-        "security_flags": [],
-        "escalation_reason": None
-    }
+def run_due_checks(scheduler, due, snapshot, active):
+    if not due:
+        return
 
-    try:
-        for event in app.stream(initial_state):
-            for key, value in event.items():
-                print(f"[GRAFO] Nodo completado: {key}")
-    except Exception as e:
-        log("error", f"Fallo en el ciclo: {e}")
+    results = ssh_runtime.run(fleet.probe_checks(due))
+    view, failures = build_status_view(results)
+    snapshot.update(view)
+    log("status_update", "Estado de servicios actualizado", dict(snapshot))
+
+    incidents = {}
+    for host_id, service_name, out, error in failures:
+        incidents[(host_id, service_name)] = (error, service_name)
+        log("monitor", f"{status_key(host_id, service_name)} CAIDO: {out}")
+    for host_id, result in results.items():
+        if isinstance(result, Exception):
+            for key in due:
+                if key[0] == host_id:
+                    incidents[key] = (f"Fallo en la conexion SSH: {str(result)}", "ssh")
+
+    launched = set()
+    for key in due:
+        interval = scheduler.record(key, key not in incidents)
+        if key not in incidents:
+            continue
+        print(f"[MONITOR] {status_key(*key)}: proximo chequeo en {interval:.0f}s")
+
+        error, affected_service = incidents[key]
+        incident_key = (key[0], affected_service)
+        running = active.get(incident_key)
+        if incident_key in launched or (running and running.status in ("queued", "running", "waiting")):
+            continue
+        launched.add(incident_key)
+        try:
+            active[incident_key] = runs.start(error, affected_service, key[0])
+        except RuntimeError as e:
+            log("error", f"No se pudo lanzar la remediacion de {status_key(*incident_key)}: {e}")
 
 
 def main():
@@ -38,20 +56,32 @@ def main():
 
     services = ", ".join(config.SERVICES.keys())
     print(f"[CONFIG] Servicios monitoreados: {services}")
-    print(f"[CONFIG] Intervalo: cada {config.MONITOR_INTERVAL}s")
+    print(f"[CONFIG] Hosts: {', '.join(config.HOSTS.keys())}")
+    print(f"[CONFIG] Intervalo base: cada {config.MONITOR_INTERVAL}s (adaptativo por servicio)")
     print(f"[CONFIG] Max reintentos: {config.MAX_RETRIES}")
+    print(f"[CONFIG] Ejecuciones concurrentes: {config.AGENT_WORKERS}")
 
     print(f"[MONITOR] Presiona Ctrl+C para detener\n")
 
+    scheduler = MonitorScheduler(jitter=config.MONITOR_JITTER, backoff=config.MONITOR_BACKOFF)
+    active = {}
+    snapshot = {}
+
     try:
         while True:
-            run_cycle()
-            print(f"\n[MONITOR] Proximo chequeo en {config.MONITOR_INTERVAL}s...\n")
-            time.sleep(config.MONITOR_INTERVAL)
+            due = []
+            try:
+                scheduler.sync()
+                due = scheduler.pop_due()
+                run_due_checks(scheduler, due, snapshot, active)
+            except Exception as e:
+                log("error", f"Fallo en el ciclo de monitoreo: {e}")
+                scheduler.reschedule(due)
+            time.sleep(min(scheduler.next_due_in(), 1.0))
     except KeyboardInterrupt:
         print("\n[MONITOR] Detenido por el operador.")
+    finally:
+        runs.shutdown()
 
 if __name__ == "__main__":
     main()
-
-
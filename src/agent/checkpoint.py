@@ -0,0 +1,89 @@
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langchain_core.runnables import RunnableConfig
+from ..core.config import config
+
+
+class DeltaSqliteSaver(SqliteSaver):
+    """Checkpointer SQLite que guarda solo los canales que cambiaron.
+
+    SqliteSaver serializa el estado completo en cada paso; aqui cada valor de
+    canal se escribe una vez por version en la tabla 'blobs' y el checkpoint
+    solo guarda las versiones, asi que cada paso cuesta lo que escribio el nodo.
+    """
+
+    def setup(self) -> None:
+        if self.is_setup:
+            return
+        super().setup()
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS blobs (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL DEFAULT '',
+                channel TEXT NOT NULL,
+                version TEXT NOT NULL,
+                type TEXT,
+                blob BLOB,
+                PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+            )
+            """
+        )
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+            new_versions: ChannelVersions) -> RunnableConfig:
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        values = checkpoint["channel_values"]
+        rows = [
+            (thread_id, checkpoint_ns, channel, str(version), *self.serde.dumps_typed(values[channel]))
+            for channel, version in new_versions.items() if channel in values
+        ]
+        if rows:
+            with self.cursor() as cur:
+                cur.executemany("INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?)", rows)
+        return super().put(config, {**checkpoint, "channel_values": {}}, metadata, new_versions)
+
+    def _load_values(self, saved: Optional[CheckpointTuple]) -> Optional[CheckpointTuple]:
+        if saved is None:
+            return None
+        versions = saved.checkpoint["channel_versions"]
+        if not versions:
+            return saved
+        keys = [(channel, str(version)) for channel, version in versions.items()]
+        placeholders = ", ".join(["(?, ?)"] * len(keys))
+        with self.cursor(transaction=False) as cur:
+            cur.execute(
+                f"SELECT channel, type, blob FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? "
+                f"AND (channel, version) IN (VALUES {placeholders})",
+                (saved.config["configurable"]["thread_id"], saved.config["configurable"].get("checkpoint_ns", ""),
+                 *[v for key in keys for v in key])
+            )
+            values = {channel: self.serde.loads_typed((type_, blob)) for channel, type_, blob in cur.fetchall()}
+        saved.checkpoint["channel_values"] = {**saved.checkpoint.get("channel_values", {}), **values}
+        return saved
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return self._load_values(super().get_tuple(config))
+
+    def list(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None,
+             before: Optional[RunnableConfig] = None, limit: Optional[int] = None) -> Iterator[CheckpointTuple]:
+        for saved in list(super().list(config, filter=filter, before=before, limit=limit)):
+            yield self._load_values(saved)
+
+    def delete_thread(self, thread_id: str) -> None:
+        super().delete_thread(thread_id)
+        with self.cursor() as cur:
+            cur.execute("DELETE FROM blobs WHERE thread_id = ?", (str(thread_id),))
+
+    def thread_ids(self) -> List[str]:
+        with self.cursor(transaction=False) as cur:
+            cur.execute("SELECT DISTINCT thread_id FROM checkpoints")
+            return [row[0] for row in cur.fetchall()]
+
+
+Path(config.CHECKPOINT_DB).parent.mkdir(parents=True, exist_ok=True)
+checkpointer = DeltaSqliteSaver(sqlite3.connect(config.CHECKPOINT_DB, check_same_thread=False))
@@ -1,14 +1,55 @@
+import uuid
+from typing import Dict, List, Optional
 from langgraph.graph import StateGraph, END
-from .state import AgentState
-from .nodes import monitor_node, diagnose_node, plan_node, approve_node, execute_node, verify_node
+from langgraph.types import Send, Command, interrupt
+from .state import AgentState, FleetState
+from .checkpoint import checkpointer
+from .locks import service_locks
+from .nodes import monitor_node, diagnose_node, plan_node, playbook_node, approve_node, execute_node, verify_node
 from ..core.config import config
 from ..core.event_bus import log
-
-
-def should_monitor_end(state: AgentState):
-    if not state.get("current_error"):
-        return "end"
-    return "continue"
+from ..core.tracing import traced_node
+from ..core.utils import current_run
+
+
+def incident_state(incident: Dict) -> AgentState:
+    return {
+        "messages": [],
+        "current_step": "monitor",
+        "current_error": incident["current_error"],
+        "affected_service": incident["affected_service"],
+        "affected_host": incident.get("affected_host"),
+        "diagnosis_log": [],
+        "attempts": [],
+        "candidate_plan": None,
+        "plan_source": None,
+        "approval_status": "PENDING",
+        "retry_count": 0,
+        "memory_consulted": False,
+        "security_flags": [],
+        "escalation_reason": None
+    }
+
+
+def route_entry(state: FleetState):
+    if state.get("current_error") and state.get("affected_service"):
+        return [Send("remediate", incident_state(state))]
+    return "monitor"
+
+
+def fan_out_incidents(state: FleetState):
+    incidents = state.get("incidents") or []
+    if not incidents:
+        return END
+    if len(incidents) > 1:
+        log("graph", f"{len(incidents)} incidentes detectados. Remediando en paralelo.")
+    return [Send("remediate", incident_state(incident)) for incident in incidents]
+
+
+def route_remediation(state: AgentState):
+    if state.get("plan_source") == "playbook":
+        return "approval"
+    return "diagnose"
 
 
 def should_approve_continue(state: AgentState):
@@ -18,10 +59,20 @@ def should_approve_continue(state: AgentState):
         return "escalate"
     elif status == "WAITING_APPROVAL":
         log("graph", "Esperando aprobacion manual. Pausando.")
-        return "end"
+        return "wait"
     return "execute"
 
 
+def wait_approval_node(state: AgentState):
+    decision = interrupt({
+        "affected_service": state.get("affected_service"),
+        "affected_host": state.get("affected_host"),
+        "candidate_plan": state.get("candidate_plan"),
+        "security_flags": state.get("security_flags", [])
+    })
+    return {"current_step": "approval", "approval_status": decision}
+
+
 def should_verify_end(state: AgentState):
     if not state.get("current_error"):
         log("graph", "Servicio recuperado. Finalizando.")
@@ -55,50 +106,141 @@ def escalation_node(state: AgentState):
     return {"current_step": "escalation", "escalation_reason": reason}
 
 
-workflow = StateGraph(AgentState)
+def build_pipeline():
+    pipeline = StateGraph(AgentState)
 
-workflow.add_node("monitor", monitor_node)
-workflow.add_node("diagnose", diagnose_node)
-workflow.add_node("plan", plan_node)
-workflow.add_node("approval", approve_node)
-workflow.add_node("execute", execute_node)
-workflow.add_node("verify", verify_node)
-workflow.add_node("report", report_node)
-workflow.add_node("escalation", escalation_node)
+    pipeline.add_node("diagnose", traced_node("diagnose", diagnose_node))
+    pipeline.add_node("plan", traced_node("plan", plan_node))
+    pipeline.add_node("playbook", traced_node("playbook", playbook_node))
+    pipeline.add_node("approval", traced_node("approval", approve_node))
+    pipeline.add_node("wait_approval", traced_node("wait_approval", wait_approval_node))
+    pipeline.add_node("execute", traced_node("execute", execute_node))
+    pipeline.add_node("verify", traced_node("verify", verify_node))
+    pipeline.add_node("report", traced_node("report", report_node))
+    pipeline.add_node("escalation", traced_node("escalation", escalation_node))
 
-workflow.set_entry_point("monitor")
+    pipeline.set_entry_point("playbook")
 
-workflow.add_conditional_edges("monitor", should_monitor_end, {"end": END, "continue": "diagnose"})
-workflow.add_edge("diagnose", "plan")
-workflow.add_edge("plan", "approval")
-workflow.add_conditional_edges("approval", should_approve_continue, {"execute": "execute", "escalate": "escalation", "end": END})
-workflow.add_edge("execute", "verify")
-workflow.add_conditional_edges("verify", should_verify_end, {"end": "report", "retry": "diagnose", "escalate": "escalation"})
-workflow.add_edge("report", END)
-workflow.add_edge("escalation", END)
+    pipeline.add_edge("diagnose", "plan")
+    pipeline.add_conditional_edges("playbook", route_remediation, {"approval": "approval", "diagnose": "diagnose"})
+    pipeline.add_edge("plan", "approval")
+    pipeline.add_conditional_edges("approval", should_approve_continue, {"execute": "execute", "escalate": "escalation", "wait": "wait_approval"})
+    pipeline.add_conditional_edges("wait_approval", should_approve_continue, {"execute": "execute", "escalate": "escalation", "wait": "wait_approval"})
+    pipeline.add_edge("execute", "verify")
+    pipeline.add_conditional_edges("verify", should_verify_end, {"end": "report", "retry": "diagnose", "escalate": "escalation"})
+    pipeline.add_edge("report", END)
+    pipeline.add_edge("escalation", END)
 
-app = workflow.compile()
+    return pipeline.compile(checkpointer=checkpointer)
+
+
+remediation_app = build_pipeline()
+
+
+def _run_config(run_id: str) -> Dict:
+    return {"configurable": {"thread_id": run_id}}
+
+
+def _locked_invoke(state: Dict, payload, run_id: str) -> Dict:
+    key = (state.get("affected_host") or config.default_host(), state.get("affected_service"))
+    if not service_locks.acquire(key):
+        log("graph", f"Remediacion de '{key[1]}' en {key[0]} ya en curso. Omitiendo.")
+        return {**state, "current_step": "locked", "run_id": run_id}
+    try:
+        result = remediation_app.invoke(payload, _run_config(run_id))
+    except Exception:
+        checkpointer.delete_thread(run_id)
+        raise
+    finally:
+        service_locks.release(key)
+    if not result.pop("__interrupt__", None):
+        # Solo las remediaciones pausadas en wait_approval se reanudan; el resto se borra.
+        checkpointer.delete_thread(run_id)
+    return {**state, **result, "run_id": run_id}
+
+
+def pipeline_id(state: AgentState) -> str:
+    run = current_run.get()
+    if run is None:
+        return uuid.uuid4().hex
+    return f"{run.run_id}:{state.get('affected_host') or config.default_host()}:{state.get('affected_service')}"
+
+
+def run_pipeline(state: AgentState, run_id: Optional[str] = None) -> Dict:
+    return _locked_invoke(state, state, run_id or pipeline_id(state))
+
+
+def get_run(run_id: str) -> Optional[Dict]:
+    snapshot = remediation_app.get_state(_run_config(run_id))
+    if not snapshot.values:
+        return None
+    return {**snapshot.values, "run_id": run_id, "next": list(snapshot.next)}
 
-resume_workflow = StateGraph(AgentState)
-
-resume_workflow.add_node("monitor", monitor_node)
-resume_workflow.add_node("diagnose", diagnose_node)
-resume_workflow.add_node("plan", plan_node)
-resume_workflow.add_node("approval", approve_node)
-resume_workflow.add_node("execute", execute_node)
-resume_workflow.add_node("verify", verify_node)
-resume_workflow.add_node("report", report_node)
-resume_workflow.add_node("escalation", escalation_node)
-
-resume_workflow.set_entry_point("execute")
-
-resume_workflow.add_conditional_edges("monitor", should_monitor_end, {"end": END, "continue": "diagnose"})
-resume_workflow.add_edge("diagnose", "plan")
-resume_workflow.add_edge("plan", "approval")
-resume_workflow.add_conditional_edges("approval", should_approve_continue, {"execute": "execute", "escalate": "escalation", "end": END})
-resume_workflow.add_edge("execute", "verify")
-resume_workflow.add_conditional_edges("verify", should_verify_end, {"end": "report", "retry": "diagnose", "escalate": "escalation"})
-resume_workflow.add_edge("report", END)
-resume_workflow.add_edge("escalation", END)
-
-resume_app = resume_workflow.compile()
+
+def resume_pipeline(run_id: str, decision: str) -> Dict:
+    """Reanuda una remediacion pausada desde su checkpoint, sin repetir nodos previos."""
+    run = get_run(run_id)
+    if not run or "wait_approval" not in run["next"]:
+        raise ValueError(f"Run '{run_id}' is not waiting for approval")
+    return _locked_invoke(run, Command(resume=decision), run_id)
+
+
+def pending_approvals() -> List[Dict]:
+    """Remediaciones pausadas; los hilos terminados que aun queden se borran al recorrerlos.
+
+    Los hilos con nodos pendientes siguen en curso (quizas en otro proceso que
+    comparte checkpoints.sqlite) y no se tocan.
+    """
+    pending = []
+    for run_id in checkpointer.thread_ids():
+        run = get_run(run_id)
+        if run is None:
+            continue
+        if "wait_approval" in run["next"]:
+            pending.append(run)
+        elif not run["next"]:
+            checkpointer.delete_thread(run_id)
+    return pending
+
+
+def remediate_node(state: AgentState):
+    return {"remediations": [run_pipeline(state)]}
+
+
+SUMMARY_KEYS = [
+    "current_error", "affected_service", "affected_host", "diagnosis_log", "attempts", "candidate_plan", "plan_source",
+    "approval_status", "retry_count", "security_flags", "escalation_reason"
+]
+
+
+def summarize_remediations(remediations: List[Dict]) -> Dict:
+    if not remediations:
+        return {}
+    waiting = [r for r in remediations if r.get("approval_status") == "WAITING_APPROVAL"]
+    unresolved = [r for r in remediations if r.get("current_error")]
+    primary = (waiting or unresolved or remediations)[0]
+    summary = {key: primary.get(key) for key in SUMMARY_KEYS}
+    summary["current_error"] = primary.get("current_error") if unresolved else None
+    return summary
+
+
+def collect_node(state: FleetState):
+    remediations = state.get("remediations", [])
+    resolved = sum(1 for r in remediations if not r.get("current_error"))
+    log("graph", f"Remediaciones completadas: {resolved}/{len(remediations)} servicios recuperados.")
+    return {"current_step": "collect", **summarize_remediations(remediations)}
+
+
+workflow = StateGraph(FleetState)
+
+workflow.add_node("monitor", traced_node("monitor", monitor_node))
+workflow.add_node("remediate", traced_node("remediate", remediate_node))
+workflow.add_node("collect", traced_node("collect", collect_node))
+
+workflow.set_conditional_entry_point(route_entry, {"monitor": "monitor"})
+
+workflow.add_conditional_edges("monitor", fan_out_incidents)
+workflow.add_edge("remediate", "collect")
+workflow.add_edge("collect", END)
+
+app = workflow.compile()
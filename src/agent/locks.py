@@ -0,0 +1,30 @@
+import threading
+from typing import Set, Tuple
+
+ServiceKey = Tuple[str, str]
+
+
+class ServiceLocks:
+    """Exclusion mutua por (host, servicio) entre pipelines de remediacion."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._held: Set[ServiceKey] = set()
+
+    def acquire(self, key: ServiceKey) -> bool:
+        with self._lock:
+            if key in self._held:
+                return False
+            self._held.add(key)
+            return True
+
+    def release(self, key: ServiceKey):
+        with self._lock:
+            self._held.discard(key)
+
+    def held(self) -> Set[ServiceKey]:
+        with self._lock:
+            return set(self._held)
+
+
+service_locks = ServiceLocks()
@@ -1,6 +1,7 @@
 from .monitor import monitor_node
 from .diagnose import diagnose_node
 from .plan import plan_node
+from .playbook import playbook_node
 from .approve import approve_node
 from .execute import execute_node
 from .verify import verify_node
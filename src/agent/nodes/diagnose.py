@@ -1,14 +1,40 @@
-from typing import Dict, Any
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Dict, Any, List
 from ..state import AgentState
-from ...core.knowledge import kb
+from ...core import knowledge
 from ...core.memory import memory
-from langchain_openai import ChatOpenAI
+from ...core.llm import chat_completion
 from langchain_core.messages import SystemMessage, HumanMessage
 from ...core.config import config
 from ...core.event_bus import log
 from ...core.utils import check_stop
 
-llm = ChatOpenAI(model=config.MODEL_NAME, temperature=config.TEMPERATURE)
+
+def _timed(timings: Dict[str, float], name: str, fn, *args):
+    start = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        timings[name] = (time.perf_counter() - start) * 1000
+
+
+def _retrieve_docs(error: str, timings: Dict[str, float]) -> List:
+    if not knowledge.kb:
+        return []
+    try:
+        return knowledge.kb.retrieve(f"How to fix: {error}", timings)
+    except Exception as e:
+        log("warning", f"Fallo la consulta RAG: {e}")
+        return []
+
+
+def _format_docs(nodes: List) -> str:
+    return "\n\n".join(
+        f"[{i+1}] ({node.metadata.get('file_name', 'desconocido')})\n{node.get_content().strip()}"
+        for i, node in enumerate(nodes)
+    )
 
 
 def diagnose_node(state: AgentState) -> Dict[str, Any]:
@@ -21,8 +47,22 @@ def diagnose_node(state: AgentState) -> Dict[str, Any]:
 
     memory_context = ""
     memory_consulted = False
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+
+    if knowledge.kb:
+        log("diagnose", "Consultando base de conocimiento (RAG)...")
+    else:
+        log("warning", "Base de conocimiento no disponible.")
+
+    with ThreadPoolExecutor(max_workers=3, thread_name_prefix="diagnose") as pool:
+        failed_future = pool.submit(copy_context().run, _timed, timings, "failed_commands_ms", memory.get_failed_commands, error)
+        similar_future = pool.submit(copy_context().run, _timed, timings, "find_similar_ms", memory.find_similar, error)
+        docs_future = pool.submit(copy_context().run, _timed, timings, "rag_ms", _retrieve_docs, error, timings)
+        failed_commands = failed_future.result()
+        similar = similar_future.result()
+        docs = docs_future.result()
 
-    failed_commands = memory.get_failed_commands(error)
     if failed_commands:
         memory_consulted = True
         memory_context += "COMANDOS QUE YA FALLARON (NO repetir):\n"
@@ -30,18 +70,12 @@ def diagnose_node(state: AgentState) -> Dict[str, Any]:
             memory_context += f"- {cmd}\n"
         log("diagnose", f"{len(failed_commands)} comandos fallidos previos identificados.")
 
-    similar = memory.find_similar(error)
     if similar and similar["success"]:
         memory_consulted = True
         memory_context += f"\nSolucion exitosa previa: {similar['command']}\n"
         log("diagnose", "Solucion exitosa previa encontrada en memoria.")
 
-    rag_context = ""
-    if kb:
-        log("diagnose", "Consultando base de conocimiento (RAG)...")
-        rag_context = kb.query(f"How to fix: {error}")
-    else:
-        log("warning", "Base de conocimiento no disponible.")
+    rag_context = _format_docs(docs) if docs else "Sin documentacion relevante."
 
     messages = [
         SystemMessage(content=(
@@ -51,7 +85,7 @@ def diagnose_node(state: AgentState) -> Dict[str, Any]:
             f"\nServicio afectado: {service}\n"
             f"\nHistorial de intentos:\n{chr(10).join(prior_logs[-3:]) if prior_logs else 'Primer intento.'}\n"
             f"\n{memory_context}"
-            f"\nDocumentacion tecnica:\n{rag_context[:1000]}\n"
+            f"\nFragmentos de documentacion tecnica:\n{rag_context}\n"
             "\nREGLAS CRITICAS:"
             "\n1. NO sugieras comandos que ya fallaron (listados arriba)."
             "\n2. Si 'service' o 'apt-get' fallan, prueba alternativas como 'systemctl', 'dmesg', o verificar ficheros de log especificos."
@@ -59,12 +93,13 @@ def diagnose_node(state: AgentState) -> Dict[str, Any]:
         HumanMessage(content=f"Error: {error}")
     ]
 
-    response = llm.invoke(messages)
-    diagnosis = response.content.strip()
+    diagnosis = _timed(timings, "llm_ms", chat_completion, messages).strip()
+    timings["total_ms"] = (time.perf_counter() - started) * 1000
     log("diagnose", f"Diagnostico: {diagnosis[:200]}...")
+    log("diagnose", "Tiempos: " + ", ".join(f"{name[:-3]} {ms:.0f}ms" for name, ms in timings.items()))
 
     return {
         "current_step": "diagnose",
-        "diagnosis_log": prior_logs + [diagnosis],
+        "diagnosis_log": [diagnosis],
         "memory_consulted": memory_consulted
     }
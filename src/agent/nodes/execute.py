@@ -1,21 +1,16 @@
+import os
+from datetime import datetime
 from typing import Dict, Any
 from ..state import AgentState
-from ...tools.ssh import SSHClient
+from ...tools.async_ssh import ssh_runtime, execute
+from ...tools.status_cache import status_cache
 from ...core.config import config
-from ...core.memory import memory
+from ...core.transcripts import transcripts
 from ...core.event_bus import log
+from ...core.tracing import tracer
 from ...core.utils import check_stop
 
 
-def get_ssh_client():
-    return SSHClient(
-        hostname=config.SSH_HOST,
-        port=config.SSH_PORT,
-        username=config.SSH_USER,
-        password=config.SSH_PASS
-    )
-
-
 def execute_node(state: AgentState) -> Dict[str, Any]:
     check_stop()
     log("execute", "Iniciando ejecucion de comandos...")
@@ -30,63 +25,88 @@ def execute_node(state: AgentState) -> Dict[str, Any]:
         log("warning", "No hay comandos para ejecutar.")
         return {"current_step": "execute"}
 
-    ssh = get_ssh_client()
     all_results = []
+    transcript = []
+    exit_codes = []
+    failures = []
     overall_success = True
+    run_stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    target = config.host_target(state.get("affected_host") or config.default_host())
 
     try:
         for i, command in enumerate(commands):
             needs_sudo = command.strip().startswith("sudo")
             clean = command.replace("sudo ", "", 1) if needs_sudo else command
 
+            spill_path = None
+            if config.OUTPUT_SPILL:
+                spill_path = os.path.join(config.OUTPUT_DIR, f"{run_stamp}-{i+1}.log")
+
             log("execute", f"[{i+1}/{len(commands)}] {command}")
-            code, out, err = ssh.execute_command(clean, use_sudo=needs_sudo)
+            with tracer.span("ssh", "exec", host=target["hostname"], sudo=needs_sudo, round_trips=1) as span:
+                code, out, err = ssh_runtime.run(execute(
+                    clean,
+                    use_sudo=needs_sudo,
+                    on_line=lambda line: log("execute", f"  {line}"),
+                    spill_path=spill_path,
+                    **target
+                ))
+                span.attributes["exit_code"] = code
 
             result_str = f"[{command}] codigo:{code}"
             if out:
                 result_str += f" salida:{out[:200]}"
-                log("execute", f"Salida: {out[:100]}...")
             if err:
                 result_str += f" error:{err[:200]}"
-                log("error", f"Error: {err[:100]}...")
+            if spill_path:
+                result_str += f" log:{spill_path}"
 
             all_results.append(result_str)
+            exit_codes.append(code)
+            transcript.append(f"$ {command}\n[codigo {code}]\n{out}\n{err}".rstrip())
 
             if code != 0:
                 overall_success = False
+                excerpt = " ".join((err or out).split())[:200]
+                failures.append(f"[{command}] codigo:{code} {excerpt}".rstrip())
                 log("error", f"Fallo en paso {i+1}. Exit code: {code}")
 
-        ssh.close()
+        status_cache.invalidate()
 
-        error_text = state.get("current_error", "")
         diagnosis_text = state.get("diagnosis_log", [""])[-1] if state.get("diagnosis_log") else ""
 
-        memory.save_episode(
-            error=error_text,
-            diagnosis=diagnosis_text,
-            command=plan,
-            result=" | ".join(all_results),
-            success=overall_success
-        )
-
         status = "exitoso" if overall_success else "parcial"
-        log("execute", f"Episodio registrado: {status}")
 
+        transcript_id = transcripts.save("execute", "\n\n".join(transcript))
         return {
             "current_step": "execute",
-            "diagnosis_log": state.get("diagnosis_log", []) + [" | ".join(all_results)]
+            "diagnosis_log": [" | ".join([f"Ejecucion {status}: codigos {exit_codes} (transcripcion {transcript_id})"] + failures)],
+            "attempts": [{
+                "attempt": state.get("retry_count", 0) + 1,
+                "source": state.get("plan_source"),
+                "command": plan,
+                "exit_codes": exit_codes,
+                "success": overall_success,
+                "diagnosis": diagnosis_text,
+                "result": " | ".join(all_results),
+                "transcript_id": transcript_id
+            }]
         }
 
     except Exception as e:
         log("error", f"Excepcion durante ejecucion: {e}")
-        memory.save_episode(
-            error=state.get("current_error", ""),
-            diagnosis="",
-            command=plan,
-            result=f"Excepcion: {str(e)}",
-            success=False
-        )
+        transcript_id = transcripts.save("execute", "\n\n".join(transcript + [f"Excepcion: {str(e)}"]))
         return {
             "current_step": "execute",
-            "diagnosis_log": state.get("diagnosis_log", []) + [f"Excepcion: {str(e)}"]
+            "diagnosis_log": [f"Excepcion: {str(e)[:200]} (transcripcion {transcript_id})"],
+            "attempts": [{
+                "attempt": state.get("retry_count", 0) + 1,
+                "source": state.get("plan_source"),
+                "command": plan,
+                "exit_codes": exit_codes,
+                "success": False,
+                "diagnosis": "",
+                "result": f"Excepcion: {str(e)[:200]}",
+                "transcript_id": transcript_id
+            }]
         }
@@ -1,76 +1,39 @@
 from typing import Dict, Any
 from ..state import AgentState
-from ...tools.ssh import SSHClient
+from ...tools.async_ssh import ssh_runtime
+from ...tools.fleet import status_key
+from ...tools.status_cache import status_cache
 from ...core.config import config
 from ...core.event_bus import log
 from ...core.utils import check_stop
 
 
-def get_ssh_client():
-    return SSHClient(
-        hostname=config.SSH_HOST,
-        port=config.SSH_PORT,
-        username=config.SSH_USER,
-        password=config.SSH_PASS
-    )
-
-
 def monitor_node(state: AgentState) -> Dict[str, Any]:
     check_stop()
     log("monitor", "Verificando estado de los servicios...")
 
-    ssh = get_ssh_client()
-    services_snapshot = {}
-    any_failure = None
-    failed_service = None
-    
-    try:
-        for service_name, service_cfg in config.SERVICES.items():
-            code, out, err = ssh.execute_command(service_cfg["check_command"])
-            is_running = service_cfg["running_indicator"] in out
-            
-            status = "running" if is_running else "stopped"
-            details = out.strip() if not is_running else "Service is active"
-            
-            services_snapshot[service_name] = {
-                "status": status,
-                "details": details,
-                "type": service_cfg["type"]
-            }
-
-            if not is_running and not any_failure:
-                any_failure = f"Servicio '{service_name}' no esta activo."
-                failed_service = service_name
-                log("monitor", f"{service_name} CAIDO: {out.strip()}")
-            elif is_running:
-                log("monitor", f"Servicio {service_name} OK")
-
-        ssh.close()
-        
-        log("status_update", "Estado de servicios actualizado", services_snapshot)
-
-        if any_failure:
-            return {
-                "current_step": "monitor",
-                "current_error": any_failure,
-                "affected_service": failed_service
-            }
-            
-        log("monitor", "Todos los servicios activos.")
-        return {"current_step": "monitor", "current_error": None, "affected_service": None}
+    snapshot = ssh_runtime.run(status_cache.get())
+    failures = snapshot.failures
 
-    except Exception as e:
+    incidents = []
+    for host_id, e in snapshot.unreachable:
         error_msg = f"Fallo en la conexion SSH: {str(e)}"
-        log("error", error_msg)
-        
-        error_snapshot = {
-            name: {"status": "error", "details": "SSH Connect Fail", "type": cfg["type"]}
-            for name, cfg in config.SERVICES.items()
-        }
-        log("status_update", "Error de conexion SSH", error_snapshot)
-        
-        return {
-            "current_step": "monitor",
-            "current_error": error_msg,
-            "affected_service": "ssh"
-        }
+        log("error", f"[{host_id}] {error_msg}")
+        incidents.append({"current_error": error_msg, "affected_service": "ssh", "affected_host": host_id})
+
+    for key, service_status in snapshot.view.items():
+        if service_status["status"] == "running":
+            log("monitor", f"Servicio {key} OK")
+    for host_id, service_name, out, error in failures:
+        log("monitor", f"{status_key(host_id, service_name)} CAIDO: {out}")
+        incidents.append({
+            "current_error": error,
+            "affected_service": service_name,
+            "affected_host": host_id
+        })
+
+    if incidents:
+        return {"current_step": "monitor", "incidents": incidents, **incidents[0]}
+
+    log("monitor", "Todos los servicios activos.")
+    return {"current_step": "monitor", "incidents": [], "current_error": None, "affected_service": None, "affected_host": None}
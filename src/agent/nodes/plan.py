@@ -1,14 +1,12 @@
 from typing import Dict, Any
 from ..state import AgentState
 from ...core.memory import memory
-from langchain_openai import ChatOpenAI
+from ...core.llm import chat_completion
 from langchain_core.messages import SystemMessage, HumanMessage
 from ...core.config import config
 from ...core.event_bus import log
 from ...core.utils import check_stop
 
-llm = ChatOpenAI(model=config.MODEL_NAME, temperature=config.TEMPERATURE)
-
 
 def ensure_sudo(command: str) -> str:
     if command.startswith("sudo "):
@@ -65,8 +63,7 @@ def plan_node(state: AgentState) -> Dict[str, Any]:
         ))
     ]
 
-    response = llm.invoke(messages)
-    raw = response.content.strip().replace("`", "").replace("```", "")
+    raw = chat_completion(messages).strip().replace("`", "").replace("```", "")
     commands = [line.strip() for line in raw.split("\n")
                 if line.strip() and not line.strip().startswith("#")]
     commands = [ensure_sudo(cmd) for cmd in commands]
@@ -81,5 +78,6 @@ def plan_node(state: AgentState) -> Dict[str, Any]:
     return {
         "current_step": "plan",
         "candidate_plan": "\n".join(commands),
-        "approval_status": "PENDING"
+        "approval_status": "PENDING",
+        "plan_source": "llm"
     }
@@ -0,0 +1,27 @@
+from typing import Dict, Any, Optional
+from ..state import AgentState
+from ...core.config import config
+from ...core.memory import memory
+from ...core.event_bus import log
+
+
+def find_playbook(state: AgentState) -> Optional[Dict]:
+    if not config.PLAYBOOK_ENABLED or state.get("retry_count", 0) > 0:
+        return None
+    return memory.find_playbook(state.get("current_error", ""), state.get("affected_service"))
+
+
+def playbook_node(state: AgentState) -> Dict[str, Any]:
+    """Consulta el playbook una sola vez; route_remediation decide con lo que queda en el estado."""
+    playbook = find_playbook(state)
+    if playbook is None:
+        return {"current_step": "playbook", "plan_source": None}
+    log("plan", f"Playbook conocido (confianza {playbook['confidence']:.2f}, "
+                f"{playbook['successes']} exito(s)): {playbook['command'].replace(chr(10), ' -> ')}")
+    return {
+        "current_step": "plan",
+        "candidate_plan": playbook["command"],
+        "approval_status": "PENDING",
+        "plan_source": "playbook",
+        "diagnosis_log": [f"Playbook: solucion previa para '{playbook['fingerprint']}'"]
+    }
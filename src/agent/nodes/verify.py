@@ -1,23 +1,38 @@
 from typing import Dict, Any
 from ..state import AgentState
-from ...tools.ssh import SSHClient
+from ...tools.async_ssh import ssh_runtime, execute
 from ...core.config import config
+from ...core.memory import memory
 from ...core.event_bus import log
+from ...core.tracing import tracer
 
 
-def get_ssh_client():
-    return SSHClient(
-        hostname=config.SSH_HOST,
-        port=config.SSH_PORT,
-        username=config.SSH_USER,
-        password=config.SSH_PASS
+def _record_attempt(state: AgentState, recovered: bool, detail: str):
+    """Un episodio por intento ejecutado, con el resultado verificado y no el codigo de salida.
+
+    Un comando que termina con 0 pero no recupera el servicio cuenta como
+    fallo, asi un playbook que no funciona pierde confianza en vez de
+    quedarse estable en la mitad.
+    """
+    attempts = state.get("attempts") or []
+    if not attempts or attempts[-1].get("attempt") != state.get("retry_count", 0) + 1:
+        return
+    attempt = attempts[-1]
+    memory.save_episode(
+        error=state.get("current_error", ""),
+        diagnosis="Playbook" if state.get("plan_source") == "playbook" else attempt.get("diagnosis", ""),
+        command=attempt["command"],
+        result=f"{attempt.get('result', '')} | verificacion: {detail}",
+        success=recovered,
+        service=state.get("affected_service")
     )
 
 
 def verify_node(state: AgentState) -> Dict[str, Any]:
     log("verify", "Comprobando si el servicio se recupero...")
     service = state.get("affected_service", "")
-    service_cfg = config.SERVICES.get(service, {})
+    host_id = state.get("affected_host") or config.default_host()
+    service_cfg = config.host_services(host_id).get(service, {})
 
     if not service_cfg:
         log("error", f"Servicio '{service}' no encontrado en configuracion.")
@@ -27,17 +42,21 @@ def verify_node(state: AgentState) -> Dict[str, Any]:
             "retry_count": state.get("retry_count", 0) + 1
         }
 
-    ssh = get_ssh_client()
     try:
-        code, out, err = ssh.execute_command(service_cfg["check_command"])
-        ssh.close()
+        with tracer.span("ssh", "check", host=host_id, round_trips=1) as span:
+            code, out, err = ssh_runtime.run(execute(service_cfg["check_command"], **config.host_target(host_id)))
+            span.attributes["exit_code"] = code
 
         if service_cfg["running_indicator"] in out:
             log("verify", f"Servicio '{service}' RECUPERADO.")
+            _record_attempt(state, True, "recuperado")
             return {"current_step": "verify", "current_error": None}
         else:
             retry = state.get("retry_count", 0) + 1
             log("warning", f"Servicio '{service}' sigue caido. Intento {retry}.")
+            if state.get("plan_source") == "playbook":
+                log("verify", "El playbook no resolvio el incidente. Se usara el diagnostico LLM.")
+            _record_attempt(state, False, f"sigue caido: {out[:200]}")
             return {
                 "current_step": "verify",
                 "current_error": state.get("current_error"),
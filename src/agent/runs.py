@@ -0,0 +1,216 @@
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+from ..core.config import config
+from ..core.event_bus import log
+from ..core.utils import current_run
+from ..tools.async_ssh import ssh_runtime
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class AgentRun:
+    def __init__(self, run_id: str, trigger: Dict):
+        self.run_id = run_id
+        self.trigger = trigger
+        self.status = "queued"
+        self.state: Dict = {}
+        self.stop_requested = False
+        self.created_at = datetime.now().isoformat()
+        self.finished_at: Optional[str] = None
+        self.future: Optional[Future] = None
+
+    def pending(self) -> List[Dict]:
+        return [r for r in self.state.get("remediations", []) if r.get("approval_status") == "WAITING_APPROVAL"]
+
+    def summary(self) -> Dict:
+        return {
+            "run_id": self.run_id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "current_step": self.state.get("current_step"),
+            "current_error": self.state.get("current_error"),
+            "affected_service": self.state.get("affected_service") or self.trigger.get("affected_service"),
+            "services": [r.get("affected_service") for r in self.state.get("remediations", [])],
+            "pending_approvals": [r.get("affected_service") for r in self.pending()]
+        }
+
+    def to_dict(self) -> Dict:
+        return {**self.state, **self.summary(), "stop_requested": self.stop_requested}
+
+
+class RunRegistry:
+    """Registro de ejecuciones concurrentes del agente.
+
+    Cada ejecucion tiene su id y su propio estado, y corre en un pool acotado de
+    hilos; la exclusion por servicio la dan los locks de los pipelines. Una
+    ejecucion pausada se aprueba o se detiene por su id sin afectar a las demas.
+    """
+
+    def __init__(self, max_workers: int = 4, max_queued: int = 32, history: int = 100):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.history = history
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent-run")
+        self._runs: "OrderedDict[str, AgentRun]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _initial_state(self, trigger: Dict) -> Dict:
+        return {
+            "messages": [],
+            "current_step": "start",
+            "current_error": trigger.get("current_error"),
+            "affected_service": trigger.get("affected_service"),
+            "affected_host": trigger.get("affected_host"),
+            "diagnosis_log": [],
+            "attempts": [],
+            "candidate_plan": None,
+            "plan_source": None,
+            "approval_status": "PENDING",
+            "retry_count": 0,
+            "memory_consulted": False,
+            "security_flags": [],
+            "escalation_reason": None,
+            "incidents": [],
+            "remediations": []
+        }
+
+    def _trim(self):
+        finished = [run_id for run_id, run in self._runs.items() if run.status not in ACTIVE_STATUSES + ("waiting",)]
+        for run_id in finished[:max(0, len(self._runs) - self.history)]:
+            del self._runs[run_id]
+
+    def _queue(self, run: AgentRun):
+        """Marca la ejecucion como encolada; el llamador debe tener self._lock."""
+        queued = sum(1 for r in self._runs.values() if r.status == "queued")
+        if queued >= self.max_queued:
+            raise RuntimeError("Run queue is full")
+        run.status = "queued"
+        self._runs[run.run_id] = run
+        self._trim()
+
+    def _submit(self, run: AgentRun, work, *args):
+        with self._lock:
+            self._queue(run)
+        run.future = self._executor.submit(self._execute, run, work, *args)
+        return run
+
+    def _execute(self, run: AgentRun, work, *args):
+        token = current_run.set(run)
+        run.status = "running"
+        try:
+            work(run, *args)
+            if run.stop_requested:
+                run.status = "stopped"
+                log("system", f"[{run.run_id}] Agente detenido por el usuario.")
+            elif run.pending():
+                run.status = "waiting"
+                log("system", f"[{run.run_id}] Agente pausado esperando aprobacion.")
+            else:
+                run.status = "completed"
+                log("system", f"[{run.run_id}] Ciclo de analisis completado.")
+        except RuntimeError as e:
+            if str(e) == "Agent stopped by user":
+                run.status = "stopped"
+                log("system", f"[{run.run_id}] Agente detenido manualmente.")
+            else:
+                run.status = "error"
+                log("error", f"[{run.run_id}] Error runtime: {e}")
+        except Exception as e:
+            run.status = "error"
+            log("error", f"[{run.run_id}] Error critico durante la ejecucion del agente: {e}")
+        finally:
+            current_run.reset(token)
+            run.finished_at = datetime.now().isoformat()
+
+    def _cycle(self, run: AgentRun):
+        from .graph import app
+        run.state = self._initial_state(run.trigger)
+        final_state = app.invoke(run.state)
+        run.state = {**run.state, **final_state}
+
+    def _resume(self, run: AgentRun, pipeline_id: str, decision: str):
+        from .graph import resume_pipeline, summarize_remediations
+        final_state = resume_pipeline(pipeline_id, decision)
+        remediations = [final_state if r.get("run_id") == pipeline_id else r for r in run.state.get("remediations", [])]
+        run.state = {**run.state, "remediations": remediations, **summarize_remediations(remediations)}
+
+    def start(self, current_error: Optional[str] = None, affected_service: Optional[str] = None,
+              affected_host: Optional[str] = None) -> AgentRun:
+        trigger = {"current_error": current_error, "affected_service": affected_service, "affected_host": affected_host}
+        return self._submit(AgentRun(uuid.uuid4().hex[:12], trigger), self._cycle)
+
+    def approve(self, run_id: str, action: str, service: Optional[str] = None) -> Dict:
+        run = self.get(run_id)
+        if run is None:
+            raise KeyError(run_id)
+        pending = [r for r in run.pending() if service is None or r.get("affected_service") == service]
+        target = pending[0] if pending else None
+        decision = "APPROVED" if action == "approve" else "REJECTED"
+        # Comprobar y encolar bajo el mismo candado: dos aprobaciones simultaneas no reanudan dos veces.
+        with self._lock:
+            if run.status != "waiting" or target is None:
+                raise ValueError(f"Run '{run_id}' is not waiting for approval")
+            self._queue(run)
+        run.future = self._executor.submit(self._execute, run, self._resume, target["run_id"], decision)
+        return target
+
+    def stop(self, run_id: str):
+        run = self.get(run_id)
+        if run is None:
+            raise KeyError(run_id)
+        run.stop_requested = True
+        ssh_runtime.cancel_agent(run_id)
+
+    def recover(self):
+        """Recupera del checkpointer las remediaciones que esperan aprobacion."""
+        from .graph import pending_approvals, summarize_remediations
+        grouped: Dict[str, List[Dict]] = {}
+        for pipeline in pending_approvals():
+            grouped.setdefault(pipeline["run_id"].split(":", 1)[0], []).append(pipeline)
+        with self._lock:
+            for run_id, remediations in grouped.items():
+                if run_id in self._runs:
+                    continue
+                run = AgentRun(run_id, {})
+                run.state = {"remediations": remediations, **summarize_remediations(remediations)}
+                run.status = "waiting"
+                self._runs[run_id] = run
+        if grouped:
+            log("system", f"{len(grouped)} ejecucion(es) pendientes de aprobacion recuperadas.")
+
+    def get(self, run_id: str) -> Optional[AgentRun]:
+        with self._lock:
+            return self._runs.get(run_id)
+
+    def list(self) -> List[AgentRun]:
+        with self._lock:
+            return list(self._runs.values())
+
+    def latest(self) -> Optional[AgentRun]:
+        with self._lock:
+            return next(reversed(self._runs.values()), None)
+
+    def status(self) -> str:
+        statuses = {run.status for run in self.list()}
+        for status in ("running", "queued", "waiting"):
+            if status in statuses:
+                return "running" if status == "queued" else status
+        latest = self.latest()
+        return latest.status if latest else "idle"
+
+    def stats(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for run in self.list():
+            counts[run.status] = counts.get(run.status, 0) + 1
+        return {"workers": self.max_workers, "max_queued": self.max_queued, **counts}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+runs = RunRegistry(max_workers=config.AGENT_WORKERS, max_queued=config.AGENT_MAX_QUEUED, history=config.AGENT_RUN_HISTORY)
@@ -0,0 +1,115 @@
+import heapq
+import random
+import time
+from typing import Dict, List, Tuple, Optional
+from ..core.config import config
+
+CheckKey = Tuple[str, str]
+
+
+class _CheckState:
+    def __init__(self, base: float, minimum: float, maximum: float):
+        self.base = base
+        self.minimum = minimum
+        self.maximum = maximum
+        self.interval = base
+        self.due = 0.0
+        self.last_ok: Optional[bool] = None
+        self.flaps = 0
+
+
+class MonitorScheduler:
+    """Planificador adaptativo de chequeos por (host, servicio).
+
+    Cada chequeo tiene su propio intervalo: tras un fallo o un cambio de estado
+    (flap) se vuelve a comprobar con el intervalo minimo, y mientras el servicio
+    sigue estable el intervalo crece hasta el maximo. Los vencimientos se guardan
+    en un heap, asi que un chequeo vencido se lanza a tiempo aunque otra
+    remediacion siga en curso.
+    """
+
+    def __init__(self, jitter: float = 0.1, backoff: float = 1.5):
+        self.jitter = jitter
+        self.backoff = backoff
+        self._checks: Dict[CheckKey, _CheckState] = {}
+        self._heap: List[Tuple[float, int, CheckKey]] = []
+        self._seq = 0
+
+    def _push(self, key: CheckKey, due: float):
+        self._checks[key].due = due
+        self._seq += 1
+        heapq.heappush(self._heap, (due, self._seq, key))
+
+    def _jittered(self, interval: float) -> float:
+        return interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def sync(self, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        current = set()
+        for host_id in config.HOSTS:
+            for name, cfg in config.host_services(host_id).items():
+                key = (host_id, name)
+                current.add(key)
+                if key in self._checks:
+                    continue
+                base = cfg.get("interval", config.MONITOR_INTERVAL)
+                self._checks[key] = _CheckState(
+                    base=base,
+                    minimum=cfg.get("min_interval", min(base, config.MONITOR_MIN_INTERVAL)),
+                    maximum=cfg.get("max_interval", base * config.MONITOR_MAX_BACKOFF)
+                )
+                self._push(key, now + random.uniform(0, self.jitter * base))
+        for key in set(self._checks) - current:
+            del self._checks[key]
+
+    def pop_due(self, now: Optional[float] = None) -> List[CheckKey]:
+        now = time.monotonic() if now is None else now
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            when, _, key = heapq.heappop(self._heap)
+            check = self._checks.get(key)
+            if check is None or check.due != when:
+                continue
+            due.append(key)
+        return due
+
+    def reschedule(self, keys: List[CheckKey], now: Optional[float] = None):
+        """Vuelve a planificar con el intervalo minimo los chequeos sacados del heap que no llegaron a registrarse."""
+        now = time.monotonic() if now is None else now
+        for key in keys:
+            check = self._checks.get(key)
+            if check is not None and check.due <= now:
+                self._push(key, now + self._jittered(check.minimum))
+
+    def next_due_in(self, now: Optional[float] = None) -> float:
+        now = time.monotonic() if now is None else now
+        while self._heap and self._heap[0][2] not in self._checks:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return config.MONITOR_INTERVAL
+        return max(0.0, self._heap[0][0] - now)
+
+    def record(self, key: CheckKey, ok: bool, now: Optional[float] = None) -> float:
+        now = time.monotonic() if now is None else now
+        check = self._checks.get(key)
+        if check is None:
+            return 0.0
+
+        changed = check.last_ok is not None and check.last_ok != ok
+        check.last_ok = ok
+        if changed:
+            check.flaps += 1
+        elif check.flaps:
+            check.flaps -= 1
+
+        if not ok or changed:
+            check.interval = check.minimum
+        else:
+            ceiling = check.base if check.flaps else check.maximum
+            check.interval = min(ceiling, check.interval * self.backoff)
+
+        self._push(key, now + self._jittered(check.interval))
+        return check.interval
+
+    def intervals(self) -> Dict[str, float]:
+        return {f"{host}/{name}": round(c.interval, 1) for (host, name), c in self._checks.items()}
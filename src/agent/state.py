@@ -1,4 +1,11 @@
-from typing import TypedDict, List, Optional
+import operator
+from typing import TypedDict, List, Optional, Dict, Annotated
+from ..core.config import config
+
+
+def window(left: Optional[List], right: Optional[List]) -> List:
+    """Los nodos solo devuelven entradas nuevas; se conservan las ultimas STATE_WINDOW."""
+    return ((left or []) + (right or []))[-config.STATE_WINDOW:]
 
 
 class AgentState(TypedDict):
@@ -6,10 +13,18 @@ class AgentState(TypedDict):
     current_step: str
     current_error: Optional[str]
     affected_service: Optional[str]
-    diagnosis_log: List[str]
+    affected_host: Optional[str]
+    diagnosis_log: Annotated[List[str], window]
+    attempts: Annotated[List[Dict], window]
     candidate_plan: Optional[str]
+    plan_source: Optional[str]
     approval_status: str
     retry_count: int
     memory_consulted: bool
     security_flags: List[str]
     escalation_reason: Optional[str]
+
+
+class FleetState(AgentState):
+    incidents: List[Dict]
+    remediations: Annotated[List[Dict], operator.add]
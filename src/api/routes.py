@@ -1,15 +1,20 @@
-from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, BackgroundTasks
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
 from pydantic import BaseModel
 from typing import List, Optional, Dict
-from datetime import datetime
 import asyncio
 
 from ..core.config import config
 from ..core.memory import memory
+from ..core.llm_cache import llm_cache
+from ..core.llm import llm_client
+from ..core.tracing import tracer
+from ..core.transcripts import transcripts
 from ..core import knowledge
-from ..tools.ssh import SSHClient
+from ..tools.async_ssh import ssh_runtime
+from ..tools.status_cache import status_cache
+from ..tools.metrics import metric_store
 from ..core.event_bus import bus, log
-from ..agent.graph import app as agent_graph
+from ..agent.runs import runs
 
 router = APIRouter()
 
@@ -39,166 +44,155 @@ async def websocket_logs(websocket: WebSocket):
         log("error", f"WebSocket error: {e}")
         bus.unsubscribe(queue)
 
-def run_agent_task():
-    from .state import AGENT_STATE
-    
-    if AGENT_STATE["status"] == "running":
-        return
-
-    AGENT_STATE["status"] = "running"
-    AGENT_STATE["stop_requested"] = False
-    AGENT_STATE["last_run"] = datetime.now().isoformat()
-    log("system", "Ejecutando ciclo de analisis bajo demanda...")
+def _run_or_404(run_id: str):
+    run = runs.get(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return run
 
+def _approve(run_id: str, action: str, service: Optional[str]):
+    if action not in ["approve", "reject"]:
+        raise HTTPException(status_code=400, detail="Invalid action")
+    _run_or_404(run_id)
     try:
-        initial_state = {
-            "current_step": "monitor",
-            "current_error": None,
-            "affected_service": None,
-            "retry_count": 0,
-            "diagnosis_log": [],
-            "security_flags": []
-        }
-        
-        final_state = agent_graph.invoke(initial_state)
-        
-        for key, value in final_state.items():
-            AGENT_STATE[key] = value
-
-        if final_state.get("approval_status") == "WAITING_APPROVAL":
-             AGENT_STATE["status"] = "waiting"
-             AGENT_STATE["approval_status"] = "WAITING_APPROVAL"
-             log("system", "Agente pausado esperando aprobacion.")
-        elif AGENT_STATE.get("stop_requested"):
-             AGENT_STATE["status"] = "idle"
-             log("system", "Agente detenido por el usuario.")
-        else:
-             AGENT_STATE["status"] = "idle"
-             log("system", "Ciclo de analisis completado.")
-        
+        target = runs.approve(run_id, action, service)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except RuntimeError as e:
-        if str(e) == "Agent stopped by user":
-            AGENT_STATE["status"] = "idle"
-            log("system", "Agente detenido manualmente.")
-        else:
-             AGENT_STATE["status"] = "error"
-             log("error", f"Error runtime: {e}")
-    except Exception as e:
-        AGENT_STATE["status"] = "error"
-        log("error", f"Error critico durante la ejecucion del agente: {e}")
+        raise HTTPException(status_code=429, detail=str(e))
+
+    msg = "Aprobacion recibida. Reanudando..." if action == "approve" else "Rechazado. Escalando..."
+    log("system", f"[{run_id}] [{target.get('affected_service')}] {msg}")
+    return {"status": "resuming", "run_id": run_id, "service": target.get("affected_service"), "message": msg}
 
 @router.post("/agent/run")
-def run_agent(background_tasks: BackgroundTasks):
-    from .state import AGENT_STATE
-    if AGENT_STATE["status"] == "running":
-        raise HTTPException(status_code=409, detail="Agent is already running")
-    
-    background_tasks.add_task(run_agent_task)
-    return {"status": "started", "message": "Agent execution triggered"}
+def run_agent():
+    try:
+        run = runs.start()
+    except RuntimeError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    log("system", f"[{run.run_id}] Ejecutando ciclo de analisis bajo demanda...")
+    return {"status": "started", "run_id": run.run_id, "message": "Agent execution triggered"}
 
 @router.post("/agent/stop")
 def stop_agent():
-    from .state import AGENT_STATE
-    if AGENT_STATE["status"] != "running":
+    active = [run for run in runs.list() if run.status in ("queued", "running")]
+    if not active:
         raise HTTPException(status_code=400, detail="Agent is not running")
     
-    AGENT_STATE["stop_requested"] = True
+    for run in active:
+        runs.stop(run.run_id)
     log("system", "Solicitud de parada recibida. Deteniendo agente...")
-    return {"status": "stopping", "message": "Stop signal sent to agent"}
-
-def resume_agent_task():
-    from .state import AGENT_STATE
-    try:
-        agent_graph.invoke(AGENT_STATE)
-    except Exception as e:
-        log("error", f"Error resuming agent: {e}")
+    return {"status": "stopping", "runs": [run.run_id for run in active], "message": "Stop signal sent to agent"}
 
 @router.post("/agent/approve")
-def approve_agent(action: str, background_tasks: BackgroundTasks):
-    from .state import AGENT_STATE
-    from ..agent.graph import resume_app
-    
-    if AGENT_STATE.get("status") != "waiting":
+def approve_agent(action: str, service: Optional[str] = None, run_id: Optional[str] = None):
+    waiting = [
+        run for run in runs.list()
+        if run.status == "waiting" and (run_id is None or run.run_id == run_id)
+        and (service is None or service in [r.get("affected_service") for r in run.pending()])
+    ]
+    if not waiting:
         raise HTTPException(status_code=400, detail="Agent is not waiting for approval")
+    return _approve(waiting[0].run_id, action, service)
 
-    if action not in ["approve", "reject"]:
-        raise HTTPException(status_code=400, detail="Invalid action")
-
-    AGENT_STATE["approval_status"] = "APPROVED" if action == "approve" else "REJECTED"
-    AGENT_STATE["status"] = "running"
-    
-    msg = "Aprobacion recibida. Reanudando..." if action == "approve" else "Rechazado. Escalando..."
-    log("system", msg)
-    
-    def _resume_task():
-        try:
-            final_state = resume_app.invoke(AGENT_STATE)
-            
-            for key, value in final_state.items():
-                AGENT_STATE[key] = value
-            
-            if AGENT_STATE.get("stop_requested"):
-                 AGENT_STATE["status"] = "idle"
-            elif AGENT_STATE.get("approval_status") == "WAITING_APPROVAL":
-                 AGENT_STATE["status"] = "waiting"
-                 log("system", "Agente pausado esperando aprobacion (ciclo reanudado).")
-            else:
-                 AGENT_STATE["status"] = "idle"
-                 log("system", "Ciclo reanudado completado.")
-        except Exception as e:
-             AGENT_STATE["status"] = "error"
-             log("error", f"Error en reanudacion: {e}")
-
-    background_tasks.add_task(_resume_task)
-    return {"status": "resuming", "message": msg}
+@router.get("/agent/approvals")
+def list_pending_approvals():
+    return [
+        {"run_id": run.run_id, **{key: r.get(key) for key in ["affected_service", "affected_host", "current_error", "candidate_plan", "security_flags"]}}
+        for run in runs.list() for r in run.pending()
+    ]
 
 @router.get("/agent/state")
 def get_agent_state():
-    from .state import AGENT_STATE
-    return AGENT_STATE
+    latest = runs.latest()
+    state = latest.to_dict() if latest else {"current_step": None, "logs": []}
+    return {**state, "status": runs.status()}
+
+@router.get("/agent/runs")
+def list_runs():
+    return {"runs": [run.summary() for run in reversed(runs.list())], "stats": runs.stats()}
+
+@router.get("/agent/runs/{run_id}")
+def get_run(run_id: str):
+    return _run_or_404(run_id).to_dict()
+
+@router.get("/transcripts/{transcript_id}")
+def get_transcript(transcript_id: str):
+    text = transcripts.load(transcript_id)
+    if text is None:
+        raise HTTPException(status_code=404, detail="Transcript not found")
+    return {"transcript_id": transcript_id, "text": text}
+
+@router.post("/agent/runs/{run_id}/stop")
+def stop_run(run_id: str):
+    run = _run_or_404(run_id)
+    if run.status not in ("queued", "running"):
+        raise HTTPException(status_code=400, detail="Run is not running")
+    runs.stop(run_id)
+    log("system", f"[{run_id}] Solicitud de parada recibida. Deteniendo ejecucion...")
+    return {"status": "stopping", "run_id": run_id, "message": "Stop signal sent to run"}
+
+@router.post("/agent/runs/{run_id}/approve")
+def approve_run(run_id: str, action: str, service: Optional[str] = None):
+    return _approve(run_id, action, service)
 
 @router.get("/status")
-def get_status():
-    services_status = {}
-    
-    ssh = None
-    try:
-        ssh = SSHClient(
-            hostname=config.SSH_HOST,
-            port=config.SSH_PORT,
-            username=config.SSH_USER,
-            password=config.SSH_PASS
-        )
-    except Exception as e:
-        for name, cfg in config.SERVICES.items():
-            services_status[name] = {
-                "status": "error",
-                "details": f"SSH unavailable: {str(e)}",
-                "type": cfg["type"]
-            }
-        return services_status
-    
-    try:
-        for name, cfg in config.SERVICES.items():
-            try:
-                code, out, err = ssh.execute_command(cfg["check_command"])
-                is_running = cfg["running_indicator"] in out
-                services_status[name] = {
-                    "status": "running" if is_running else "stopped",
-                    "details": out.strip() if not is_running else "Service is active",
-                    "type": cfg["type"]
-                }
-            except Exception as e:
-                 services_status[name] = {
-                    "status": "error",
-                    "details": str(e),
-                    "type": cfg["type"]
-                }
-    finally:
-        if ssh:
-            ssh.close()
-        
-    return services_status
+async def get_status():
+    snapshot = await ssh_runtime.submit(status_cache.get())
+    return snapshot.view
+
+@router.get("/status/cache")
+def get_status_cache_stats():
+    return status_cache.stats()
+
+@router.get("/metrics")
+def get_metrics():
+    return metric_store.summary()
+
+@router.get("/traces")
+def get_traces():
+    return tracer.export()
+
+@router.get("/traces/spans")
+def get_trace_spans(run_id: Optional[str] = None):
+    return tracer.spans(run_id)
+
+@router.delete("/traces")
+def clear_traces():
+    tracer.reset()
+    return {"status": "ok", "message": "Traces cleared"}
+
+@router.get("/llm/client")
+def get_llm_client_stats():
+    return llm_client.stats()
+
+@router.get("/llm/cache")
+def get_llm_cache_stats():
+    return llm_cache.stats()
+
+@router.delete("/llm/cache")
+def clear_llm_cache():
+    llm_cache.clear()
+    log("config", "Cache de respuestas LLM vaciada.")
+    return {"status": "ok", "message": "LLM cache cleared"}
+
+@router.get("/hosts")
+def list_hosts():
+    hosts = {}
+    for host_id in config.HOSTS:
+        target = config.host_target(host_id)
+        hosts[host_id] = {
+            "hostname": target["hostname"],
+            "port": target["port"],
+            "username": target["username"],
+            "services": list(config.host_services(host_id).keys())
+        }
+    return hosts
+
+@router.get("/ssh/pool")
+def get_ssh_pool_stats():
+    return ssh_runtime.stats()
 
 @router.get("/services")
 def list_services():
@@ -225,8 +219,12 @@ def delete_service(name: str):
     return {"status": "ok", "message": f"Service {name} removed"}
 
 @router.get("/memory")
-def get_memory():
-    return memory.get_episodes()
+def get_memory(limit: int = 200):
+    return memory.get_rollups(limit)
+
+@router.get("/memory/episodes")
+def get_memory_episodes(limit: int = 100, signature: Optional[str] = None):
+    return memory.get_episodes(limit, signature)
 
 from fastapi.responses import StreamingResponse
 import json
@@ -252,5 +250,6 @@ def get_config():
         "services": list(config.SERVICES.keys()),
         "interval": config.MONITOR_INTERVAL,
         "max_retries": config.MAX_RETRIES,
-        "mode": "on-demand"
+        "mode": "on-demand",
+        "agent_workers": runs.max_workers
     }
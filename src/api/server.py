@@ -1,10 +1,17 @@
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from .routes import router
-from .state import AGENT_STATE
+from ..agent.runs import runs
+from ..core.config import config
 from ..core.event_bus import log
 from ..core.knowledge import init_knowledge_base
+from ..core.memory import memory
+from ..tools.async_ssh import ssh_runtime
 import threading
 
 
@@ -14,10 +21,21 @@ async def lifespan(app: FastAPI):
     log("system", "Sentinel AI Iniciado (Modo API) 🚀")
     
     threading.Thread(target=init_knowledge_base, daemon=True).start()
-    
+    threading.Thread(target=runs.recover, daemon=True).start()
+    memory.start_compaction()
+
+    startup_ms = (time.perf_counter() - _IMPORT_STARTED) * 1000
+    if startup_ms > config.STARTUP_BUDGET_MS:
+        log("system", f"Arranque en {startup_ms:.0f}ms, supera el presupuesto de {config.STARTUP_BUDGET_MS:.0f}ms")
+    else:
+        log("system", f"Arranque en {startup_ms:.0f}ms")
+
     yield
 
     log("system", "Apagando Sentinel AI...")
+    runs.shutdown()
+    memory.stop_compaction()
+    ssh_runtime.shutdown()
 
 
 app = FastAPI(title="Sentinel AI API", version="2.0.0", lifespan=lifespan)
@@ -38,5 +56,5 @@ def root():
         "status": "ok", 
         "service": "Sentinel AI API", 
         "mode": "on-demand",
-        "agent_status": AGENT_STATE["status"]
+        "agent_status": runs.status()
     }
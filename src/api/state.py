@@ -1,9 +0,0 @@
-AGENT_STATE = {
-    "status": "idle",
-
-    "last_run": None,
-    "current_step": None,
-    "current_step": None,
-    "logs": [],
-    "stop_requested": False
-}
@@ -26,14 +26,80 @@ class Config:
     SSH_PORT = int(os.getenv("SSH_PORT", 2222))
     SSH_USER = os.getenv("SSH_USER", "sentinel")
     SSH_PASS = os.getenv("SSH_PASS")
+    SSH_POOL_MAX_CONNECTIONS = int(os.getenv("SSH_POOL_MAX_CONNECTIONS", 64))
+    SSH_MAX_SESSIONS_PER_HOST = int(os.getenv("SSH_MAX_SESSIONS_PER_HOST", 8))
+    SSH_POOL_IDLE_TIMEOUT = int(os.getenv("SSH_POOL_IDLE_TIMEOUT", 300))
+    SSH_POOL_ACQUIRE_TIMEOUT = int(os.getenv("SSH_POOL_ACQUIRE_TIMEOUT", 30))
+    SSH_KEEPALIVE_INTERVAL = int(os.getenv("SSH_KEEPALIVE_INTERVAL", 30))
 
-    DATA_DIR = "data"
+    DATA_DIR = os.getenv("DATA_DIR", "data")
     MANUALS_DIR = os.path.join(DATA_DIR, "manuals")
     MEMORY_DIR = os.path.join(DATA_DIR, "memory")
+    OUTPUT_DIR = os.path.join(DATA_DIR, "output")
+    TRANSCRIPTS_DIR = os.path.join(DATA_DIR, "transcripts")
     SERVICES_FILE = os.path.join(DATA_DIR, "services.json")
+    HOSTS_FILE = os.path.join(DATA_DIR, "hosts.json")
+    LLM_CACHE_DB = os.getenv("LLM_CACHE_DB", os.path.join(DATA_DIR, "llm_cache.sqlite"))
+    CHECKPOINT_DB = os.getenv("CHECKPOINT_DB", os.path.join(DATA_DIR, "checkpoints.sqlite"))
 
     MONITOR_INTERVAL = 30
+    MONITOR_MIN_INTERVAL = 5
+    MONITOR_MAX_BACKOFF = 4
+    MONITOR_BACKOFF = 1.5
+    MONITOR_JITTER = 0.1
+    PROBE_MODE = os.getenv("PROBE_MODE", "batched")
+    STATUS_CACHE_TTL = float(os.getenv("STATUS_CACHE_TTL", 5))
     MAX_RETRIES = 5
+    STATE_WINDOW = int(os.getenv("STATE_WINDOW", 6))
+    TRANSCRIPTS_RETENTION_DAYS = float(os.getenv("TRANSCRIPTS_RETENTION_DAYS", 30))
+    TRANSCRIPTS_MAX_FILES = int(os.getenv("TRANSCRIPTS_MAX_FILES", 5000))
+    TRANSCRIPTS_PRUNE_INTERVAL = float(os.getenv("TRANSCRIPTS_PRUNE_INTERVAL", 600))
+    METRICS_WINDOW = int(os.getenv("METRICS_WINDOW", 120))
+    METRICS_EWMA_ALPHA = float(os.getenv("METRICS_EWMA_ALPHA", 0.3))
+    METRICS_ZSCORE = float(os.getenv("METRICS_ZSCORE", 4.0))
+    METRICS_MIN_SAMPLES = int(os.getenv("METRICS_MIN_SAMPLES", 10))
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", 256))
+    LLM_CACHE_MAX_MB = int(os.getenv("LLM_CACHE_MAX_MB", 64))
+    LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", 86400))
+    PROVIDER = os.getenv("SENTINEL_PROVIDER", "openai")
+    FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", 0))
+    LLM_BASE_URL = os.getenv("OPENAI_BASE_URL")
+    LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", 60))
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+    LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", 500))
+    LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", 30000))
+    LLM_OUTPUT_TOKENS = int(os.getenv("LLM_OUTPUT_TOKENS", 512))
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 4))
+    LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", 0.5))
+    LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", 20))
+    PLAYBOOK_ENABLED = os.getenv("PLAYBOOK_ENABLED", "true").lower() == "true"
+    PLAYBOOK_MIN_CONFIDENCE = float(os.getenv("PLAYBOOK_MIN_CONFIDENCE", 0.5))
+    PLAYBOOK_HALF_LIFE_DAYS = float(os.getenv("PLAYBOOK_HALF_LIFE_DAYS", 30))
+    MEMORY_RETRIEVAL = os.getenv("MEMORY_RETRIEVAL", "keyword")
+    MEMORY_VECTORS = os.getenv("MEMORY_VECTORS", "tfidf")
+    MEMORY_VECTOR_DIM = int(os.getenv("MEMORY_VECTOR_DIM", 512))
+    MEMORY_SIMILAR_THRESHOLD = float(os.getenv("MEMORY_SIMILAR_THRESHOLD", 0.5))
+    MEMORY_FAILED_THRESHOLD = float(os.getenv("MEMORY_FAILED_THRESHOLD", 0.7))
+    MEMORY_FAILED_TOP_K = int(os.getenv("MEMORY_FAILED_TOP_K", 5))
+    MEMORY_HALF_LIFE_DAYS = float(os.getenv("MEMORY_HALF_LIFE_DAYS", 30))
+    MEMORY_RETENTION_DAYS = float(os.getenv("MEMORY_RETENTION_DAYS", 30))
+    MEMORY_RETENTION_EPISODES = int(os.getenv("MEMORY_RETENTION_EPISODES", 100000))
+    MEMORY_COMPACT_INTERVAL = float(os.getenv("MEMORY_COMPACT_INTERVAL", 600))
+    AGENT_WORKERS = int(os.getenv("AGENT_WORKERS", 4))
+    AGENT_MAX_QUEUED = int(os.getenv("AGENT_MAX_QUEUED", 32))
+    AGENT_RUN_HISTORY = int(os.getenv("AGENT_RUN_HISTORY", 100))
+    STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", 1500))
+    TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+    TRACING_HISTORY = int(os.getenv("TRACING_HISTORY", 2000))
+
+    FLEET_MAX_WORKERS = int(os.getenv("FLEET_MAX_WORKERS", 32))
+    FLEET_HOST_RATE = float(os.getenv("FLEET_HOST_RATE", 2))
+
+    OUTPUT_HEAD_BYTES = int(os.getenv("OUTPUT_HEAD_BYTES", 4096))
+    OUTPUT_TAIL_BYTES = int(os.getenv("OUTPUT_TAIL_BYTES", 16384))
+    OUTPUT_LINES_PER_SEC = int(os.getenv("OUTPUT_LINES_PER_SEC", 20))
+    OUTPUT_SPILL = os.getenv("OUTPUT_SPILL", "false").lower() == "true"
     
 
     DEFAULT_SERVICES = {
@@ -56,6 +122,7 @@ class Config:
 
     def __init__(self):
         self.SERVICES = self.load_services()
+        self.HOSTS = self.load_hosts()
 
     def load_services(self):
         if os.path.exists(self.SERVICES_FILE):
@@ -66,6 +133,37 @@ class Config:
                 return self.DEFAULT_SERVICES.copy()
         return self.DEFAULT_SERVICES.copy()
 
+    def load_hosts(self):
+        if os.path.exists(self.HOSTS_FILE):
+            try:
+                with open(self.HOSTS_FILE, "r") as f:
+                    return json.load(f)
+            except Exception:
+                pass
+        return {
+            "local": {
+                "hostname": self.SSH_HOST,
+                "port": self.SSH_PORT,
+                "username": self.SSH_USER
+            }
+        }
+
+    def default_host(self):
+        return next(iter(self.HOSTS))
+
+    def host_services(self, host_id):
+        host = self.HOSTS.get(host_id, {})
+        return host.get("services", self.SERVICES)
+
+    def host_target(self, host_id):
+        host = self.HOSTS[host_id]
+        return {
+            "hostname": host.get("hostname", self.SSH_HOST),
+            "port": host.get("port", self.SSH_PORT),
+            "username": host.get("username", self.SSH_USER),
+            "password": host.get("password", self.SSH_PASS)
+        }
+
     def save_services(self):
         Path(self.DATA_DIR).mkdir(parents=True, exist_ok=True)
         with open(self.SERVICES_FILE, "w") as f:
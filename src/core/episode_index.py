@@ -0,0 +1,58 @@
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+from .fingerprint import canonicalize
+
+
+def keywords(text: Optional[str]) -> FrozenSet[str]:
+    return frozenset(canonicalize(text or "").split())
+
+
+class KeywordIndex:
+    """Indice invertido palabra -> grupos de rollups con el mismo conjunto de palabras.
+
+    Los rollups de un mismo error comparten grupo, asi que las listas de
+    postings crecen con los errores distintos y no con el historial. Cada
+    grupo guarda la posicion (id del ultimo episodio) de su rollup mas
+    reciente y los comandos que alguna vez fallaron con ese error.
+    """
+
+    def __init__(self):
+        self._groups: Dict[FrozenSet[str], int] = {}
+        self._latest: List[int] = []
+        self._failed: List[Set[str]] = []
+        self._postings: Dict[str, List[int]] = {}
+
+    def add(self, position: int, rollup: Dict):
+        words = keywords(rollup.get("error"))
+        group = self._groups.get(words)
+        if group is None:
+            group = self._groups[words] = len(self._latest)
+            self._latest.append(position)
+            self._failed.append(set())
+            for word in words:
+                self._postings.setdefault(word, []).append(group)
+        self._latest[group] = position
+        if rollup["failures"]:
+            self._failed[group].add(rollup["command"])
+
+    def _overlaps(self, error: str) -> Dict[int, int]:
+        counts: Dict[int, int] = {}
+        for word in keywords(error):
+            for group in self._postings.get(word, ()):
+                counts[group] = counts.get(group, 0) + 1
+        return counts
+
+    def best_match(self, error: str) -> Tuple[Optional[int], int]:
+        """(posicion, solapamiento) del rollup mas reciente con mas palabras en comun."""
+        best, best_score = None, 0
+        for group, score in self._overlaps(error).items():
+            position = self._latest[group]
+            if score > best_score or (score == best_score and position > best):
+                best, best_score = position, score
+        return best, best_score
+
+    def failed_commands(self, error: str) -> Set[str]:
+        """Comandos fallidos de los rollups con al menos una palabra en comun."""
+        failed: Set[str] = set()
+        for group in self._overlaps(error):
+            failed |= self._failed[group]
+        return failed
@@ -0,0 +1,259 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+COLUMNS = ("timestamp", "error", "service", "diagnosis", "command", "result", "success", "signature")
+# Subir la version cuando cambien las reglas de fingerprint.py: recalcula firmas y rollups.
+SCHEMA_VERSION = 2
+ROLLUP_COLUMNS = ("service", "signature", "command", "error", "diagnosis", "result", "count", "successes",
+                  "first_seen", "last_seen", "last_success", "last_outcome", "episode_id")
+
+_UPSERT_ROLLUP = f"""
+    INSERT INTO rollups ({', '.join(ROLLUP_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, 1, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (service, signature, command) DO UPDATE SET
+        diagnosis = excluded.diagnosis,
+        result = excluded.result,
+        count = count + 1,
+        successes = successes + excluded.successes,
+        last_seen = excluded.last_seen,
+        last_success = COALESCE(excluded.last_success, last_success),
+        last_outcome = excluded.last_outcome,
+        episode_id = excluded.episode_id
+"""
+
+
+class EpisodeStore:
+    """Historial de episodios en SQLite (WAL), solo de anexado.
+
+    Cada episodio es una fila nueva: escribir cuesta lo mismo con 100 que con
+    un millon de episodios, un corte a mitad de escritura no corrompe el
+    historial y varios procesos pueden escribir a la vez. La lectura es
+    incremental por id, asi cada proceso recoge tambien lo que escriben otros.
+
+    En la misma transaccion se acumula el episodio en 'rollups', una fila por
+    (servicio, firma del error, comando) con contadores y primera/ultima vez
+    visto. La firma de cada episodio (ver fingerprint.py) se guarda con el, asi
+    que agrupar o filtrar por error es una comparacion de igualdad. Los
+    rollups no se borran nunca; los episodios crudos se pueden compactar por
+    antiguedad o cantidad sin perder lo aprendido.
+    """
+
+    def __init__(self, path: str, signature: Callable[[str], str]):
+        self.path = path
+        self.signature = signature
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            self._conn.executescript(
+                """
+                PRAGMA journal_mode=WAL;
+                PRAGMA synchronous=NORMAL;
+                CREATE TABLE IF NOT EXISTS episodes (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    error TEXT,
+                    service TEXT,
+                    diagnosis TEXT,
+                    command TEXT,
+                    result TEXT,
+                    success INTEGER NOT NULL,
+                    signature TEXT
+                );
+                CREATE INDEX IF NOT EXISTS episodes_timestamp ON episodes (timestamp);
+                CREATE TABLE IF NOT EXISTS rollups (
+                    service TEXT NOT NULL,
+                    signature TEXT NOT NULL,
+                    command TEXT NOT NULL,
+                    error TEXT,
+                    diagnosis TEXT,
+                    result TEXT,
+                    count INTEGER NOT NULL,
+                    successes INTEGER NOT NULL,
+                    first_seen TEXT NOT NULL,
+                    last_seen TEXT NOT NULL,
+                    last_success TEXT,
+                    last_outcome INTEGER NOT NULL,
+                    episode_id INTEGER NOT NULL,
+                    PRIMARY KEY (service, signature, command)
+                );
+                CREATE INDEX IF NOT EXISTS rollups_episode ON rollups (episode_id);
+                """
+            )
+            self._migrate()
+            self._conn.execute("CREATE INDEX IF NOT EXISTS episodes_signature ON episodes (signature)")
+        return self._conn
+
+    def _migrate(self):
+        """Pone al dia historiales de versiones anteriores, una sola vez por fichero.
+
+        Recalcula la firma de los episodios y vuelve a agrupar los rollups
+        con la firma actual, fusionando los que ahora coinciden; si no habia
+        rollups se construyen a partir de los episodios.
+        """
+        db = self._conn
+        if db.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            if db.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                if "signature" not in {row[1] for row in db.execute("PRAGMA table_info(episodes)")}:
+                    db.execute("ALTER TABLE episodes ADD COLUMN signature TEXT")
+                db.create_function("error_signature", 1, lambda error: self.signature(error or ""), deterministic=True)
+                db.execute("UPDATE episodes SET signature = error_signature(error)")
+                if db.execute("SELECT 1 FROM rollups LIMIT 1").fetchone():
+                    self._rekey_rollups(db)
+                else:
+                    cursor = db.execute(f"SELECT id, {', '.join(COLUMNS)} FROM episodes ORDER BY id")
+                    while rows := cursor.fetchmany(10000):
+                        db.executemany(_UPSERT_ROLLUP, [self._rollup_row(row[0], dict(zip(COLUMNS, row[1:]))) for row in rows])
+                db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+    def _rekey_rollups(self, db: sqlite3.Connection):
+        merged: Dict[Tuple, Dict] = {}
+        for row in db.execute(f"SELECT {', '.join(ROLLUP_COLUMNS)} FROM rollups ORDER BY episode_id").fetchall():
+            rollup = dict(zip(ROLLUP_COLUMNS, row))
+            key = (rollup["service"], self.signature(rollup["error"] or ""), rollup["command"])
+            current = merged.get(key)
+            if current is None:
+                merged[key] = {**rollup, "signature": key[1]}
+                continue
+            current.update(
+                diagnosis=rollup["diagnosis"], result=rollup["result"], last_outcome=rollup["last_outcome"],
+                episode_id=rollup["episode_id"], count=current["count"] + rollup["count"],
+                successes=current["successes"] + rollup["successes"],
+                first_seen=min(current["first_seen"], rollup["first_seen"]),
+                last_seen=max(current["last_seen"], rollup["last_seen"]),
+                last_success=max(filter(None, (current["last_success"], rollup["last_success"])), default=None)
+            )
+        db.execute("DELETE FROM rollups")
+        db.executemany(
+            f"INSERT INTO rollups ({', '.join(ROLLUP_COLUMNS)}) VALUES ({', '.join('?' * len(ROLLUP_COLUMNS))})",
+            ([rollup[column] for column in ROLLUP_COLUMNS] for rollup in merged.values())
+        )
+
+    def _rollup_row(self, episode_id: int, episode: Dict) -> list:
+        success = bool(episode.get("success"))
+        return [
+            episode.get("service") or "", episode.get("signature") or self.signature(episode.get("error") or ""),
+            (episode.get("command") or "").strip(),
+            episode.get("error"), episode.get("diagnosis"), episode.get("result"), int(success),
+            episode["timestamp"], episode["timestamp"], episode["timestamp"] if success else None, int(success), episode_id
+        ]
+
+    def _insert(self, db: sqlite3.Connection, episode: Dict) -> int:
+        if not episode.get("signature"):
+            episode = {**episode, "signature": self.signature(episode.get("error") or "")}
+        episode_id = db.execute(
+            f"INSERT INTO episodes ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+            [episode.get(column) for column in COLUMNS]
+        ).lastrowid
+        db.execute(_UPSERT_ROLLUP, self._rollup_row(episode_id, episode))
+        return episode_id
+
+    def append(self, episode: Dict) -> int:
+        with self._lock:
+            db = self._db()
+            episode_id = self._insert(db, episode)
+            db.commit()
+            return episode_id
+
+    def append_many(self, episodes: Iterable[Dict]):
+        with self._lock:
+            db = self._db()
+            for episode in episodes:
+                self._insert(db, episode)
+            db.commit()
+
+    def read(self, after_id: int = 0, batch: int = 10000) -> Iterator[Tuple[int, Dict]]:
+        """Episodios con id > after_id, en orden, leidos por lotes."""
+        while True:
+            with self._lock:
+                rows = self._db().execute(
+                    f"SELECT id, {', '.join(COLUMNS)} FROM episodes WHERE id > ? ORDER BY id LIMIT ?",
+                    (after_id, batch)
+                ).fetchall()
+            for row in rows:
+                episode = dict(zip(COLUMNS, row[1:]))
+                episode["success"] = bool(episode["success"])
+                yield row[0], episode
+            if len(rows) < batch:
+                return
+            after_id = rows[-1][0]
+
+    def read_rollups(self, after_id: int = 0, batch: int = 10000) -> Iterator[Tuple[int, Dict]]:
+        """Rollups actualizados por un episodio con id > after_id, por orden de ultimo episodio."""
+        while True:
+            with self._lock:
+                rows = self._db().execute(
+                    f"SELECT {', '.join(ROLLUP_COLUMNS)} FROM rollups WHERE episode_id > ? ORDER BY episode_id LIMIT ?",
+                    (after_id, batch)
+                ).fetchall()
+            for row in rows:
+                rollup = dict(zip(ROLLUP_COLUMNS, row))
+                rollup["service"] = rollup["service"] or None
+                rollup["failures"] = rollup["count"] - rollup["successes"]
+                rollup["success_rate"] = rollup["successes"] / rollup["count"]
+                rollup["success"] = bool(rollup.pop("last_outcome"))
+                rollup["timestamp"] = rollup["last_seen"]
+                yield rollup["episode_id"], rollup
+            if len(rows) < batch:
+                return
+            after_id = rows[-1][-1]
+
+    def recent(self, limit: int = 100, signature: Optional[str] = None) -> List[Dict]:
+        """Ultimos episodios crudos, del mas reciente al mas antiguo; opcionalmente de una sola firma."""
+        where, params = ("WHERE signature = ?", (signature, limit)) if signature else ("", (limit,))
+        with self._lock:
+            rows = self._db().execute(
+                f"SELECT {', '.join(COLUMNS)} FROM episodes {where} ORDER BY id DESC LIMIT ?", params
+            ).fetchall()
+        episodes = [dict(zip(COLUMNS, row)) for row in rows]
+        for episode in episodes:
+            episode["success"] = bool(episode["success"])
+        return episodes
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db().execute("SELECT COUNT(*) FROM episodes").fetchone()[0]
+
+    def compact(self, max_age_days: float = 0, max_episodes: int = 0) -> int:
+        """Borra episodios crudos mas antiguos que max_age_days o por encima de los max_episodes mas recientes.
+
+        Los rollups ya contienen esos episodios, asi que no se pierde nada de
+        lo que usan las busquedas. Un limite a 0 lo desactiva.
+        """
+        removed = 0
+        with self._lock:
+            db = self._db()
+            if max_age_days:
+                cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+                removed += db.execute("DELETE FROM episodes WHERE timestamp < ?", (cutoff,)).rowcount
+            if max_episodes:
+                removed += db.execute(
+                    "DELETE FROM episodes WHERE id <= (SELECT id FROM episodes ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                    (max_episodes,)
+                ).rowcount
+            db.commit()
+        return removed
+
+    def import_json(self, path: str) -> int:
+        """Migra un episodes.json antiguo una sola vez y lo renombra a .migrated."""
+        if not os.path.exists(path) or self.count():
+            return 0
+        with open(path, "r") as f:
+            episodes = json.load(f)
+        self.append_many(episodes)
+        os.replace(path, path + ".migrated")
+        return len(episodes)
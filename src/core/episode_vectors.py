@@ -0,0 +1,193 @@
+import hashlib
+import os
+import re
+import zlib
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set, Tuple
+import numpy as np
+from .fingerprint import canonicalize
+
+_TOKENS = re.compile(r"[a-z_][a-z0-9_\-\.]*|\d+")
+_NUMBER = re.compile(r"\d+")
+_FILE_UNSAFE = re.compile(r"[^\w.\-]+")
+
+
+def hashed_tf(text: str, dim: int) -> np.ndarray:
+    """Vector TF sublineal con hashing de palabras y trigramas de caracteres."""
+    vector = np.zeros(dim, dtype=np.float32)
+    for word in _TOKENS.findall((text or "").lower()):
+        word = _NUMBER.sub("0", word)
+        features = [word] + [word[i:i + 3] for i in range(len(word) - 2)] if len(word) > 3 else [word]
+        for feature in features:
+            vector[zlib.crc32(feature.encode("utf-8")) % dim] += 1.0
+    np.log1p(vector, out=vector)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class VectorIndex:
+    """Busqueda semantica de rollups de episodios sobre una matriz float32 contigua.
+
+    Hay una fila por forma canonica de error distinta (ver fingerprint.py),
+    guardada en un fichero memory-mapped ('<path>-<dim>-<codificador>.f32'
+    con la clave de cada fila en '.keys'). La fila de un texto se busca por su
+    clave y no depende del orden de los rollups, asi que al arrancar solo se
+    calculan las filas nuevas; cambiar la dimension o el codificador usa otros
+    ficheros. La similitud coseno contra todas las filas es un unico producto
+    matriz-vector; en modo 'tfidf' el IDF se aplica en la consulta y los
+    vectores guardados no cambian.
+    """
+
+    def __init__(self, path: str, dim: int = 512, mode: str = "tfidf", encoder: Optional[Callable] = None,
+                 half_life_days: float = 30, encoder_id: str = "hashed"):
+        self.path = f"{path}-{dim}-{_FILE_UNSAFE.sub('_', encoder_id)}"
+        self.dim = dim
+        self.mode = mode
+        self.encoder = encoder or (lambda text: hashed_tf(text, dim))
+        self.half_life_days = half_life_days
+        self._groups: Dict[str, int] = {}
+        self._rows: Dict[int, int] = {}
+        self._failed: Dict[int, Set[str]] = {}
+        self._members: Dict[int, Dict[Tuple, Tuple[int, int]]] = {}
+        self._capacity = 0
+        self._matrix: Optional[np.memmap] = None
+        self._keys: Optional[np.memmap] = None
+        self._stored = 0
+        self._latest = np.zeros(0, dtype=np.int64)
+        self._active = np.zeros(0, dtype=bool)
+        self._successes = np.zeros(0, dtype=np.float32)
+        self._totals = np.zeros(0, dtype=np.float32)
+        self._last_seen = np.zeros(0, dtype=np.float64)
+        self._df = np.zeros(dim, dtype=np.float32)
+        self._norms: Optional[np.ndarray] = None
+        self._open()
+
+    def _open(self):
+        """Mapea los ficheros existentes y carga la correspondencia clave -> fila."""
+        matrix_path, keys_path = self.path + ".f32", self.path + ".keys"
+        rows = 0
+        if os.path.exists(keys_path) and os.path.exists(matrix_path):
+            rows = min(os.path.getsize(keys_path) // 8, os.path.getsize(matrix_path) // (4 * self.dim))
+            if (os.path.getsize(keys_path) != rows * 8
+                    or os.path.getsize(matrix_path) != rows * 4 * self.dim):
+                print(f"[MEMORIA] Vectores de {self.path} con tamano inconsistente, se ajustan a {rows} filas")
+                for path, width in ((keys_path, 8), (matrix_path, 4 * self.dim)):
+                    with open(path, "r+b") as f:
+                        f.truncate(rows * width)
+        self._grow(max(rows, 64))
+        # Las filas se escriben en orden y la clave despues del vector: la primera clave vacia marca el final.
+        empty = np.flatnonzero(self._keys[:rows] == 0)
+        self._stored = int(empty[0]) if len(empty) else rows
+        self._rows = {int(key): row for row, key in enumerate(self._keys[:self._stored])}
+
+    def _grow(self, capacity: int):
+        """Amplia los ficheros y los vuelve a mapear; las filas existentes no se copian."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        for suffix, width in ((".f32", 4 * self.dim), (".keys", 8)):
+            with open(self.path + suffix, "ab") as f:
+                if f.tell() < capacity * width:
+                    f.truncate(capacity * width)
+        self._matrix = np.memmap(self.path + ".f32", dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        self._keys = np.memmap(self.path + ".keys", dtype=np.uint64, mode="r+", shape=(capacity,))
+        extra = capacity - len(self._successes)
+        self._latest = np.concatenate([self._latest, np.full(extra, -1, dtype=np.int64)])
+        self._active = np.concatenate([self._active, np.zeros(extra, dtype=bool)])
+        self._successes = np.concatenate([self._successes, np.zeros(extra, dtype=np.float32)])
+        self._totals = np.concatenate([self._totals, np.zeros(extra, dtype=np.float32)])
+        self._last_seen = np.concatenate([self._last_seen, np.zeros(extra, dtype=np.float64)])
+        self._capacity = capacity
+
+    def _row(self, text: str) -> int:
+        """Fila del texto canonico; solo se codifica si no estaba guardada en ninguna sesion."""
+        row = self._groups.get(text)
+        if row is not None:
+            return row
+        key = int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little") or 1
+        row = self._rows.get(key)
+        if row is None:
+            row = self._rows[key] = self._stored
+            if row >= self._capacity:
+                self._grow(2 * self._capacity)
+            self._matrix[row] = self.encoder(text)
+            self._keys[row] = key
+            self._stored += 1
+        self._groups[text] = row
+        self._active[row] = True
+        self._df += self._matrix[row] > 0
+        self._failed[row] = set()
+        self._members[row] = {}
+        self._norms = None
+        return row
+
+    def add(self, position: int, rollup: Dict):
+        """Registra un rollup nuevo o actualizado; los contadores del grupo se corrigen por diferencia."""
+        group = self._row(canonicalize(rollup.get("error")))
+        member = (rollup.get("service"), rollup["signature"], rollup["command"])
+        successes, total = self._members[group].get(member, (0, 0))
+        self._members[group][member] = (rollup["successes"], rollup["count"])
+        self._latest[group] = position
+        self._successes[group] += rollup["successes"] - successes
+        self._totals[group] += rollup["count"] - total
+        if rollup["failures"]:
+            self._failed[group].add(rollup["command"])
+        seen = datetime.fromisoformat(rollup["last_seen"]).timestamp()
+        self._last_seen[group] = max(self._last_seen[group], seen)
+
+    def _weights(self) -> np.ndarray:
+        if self.mode != "tfidf":
+            return np.ones(self.dim, dtype=np.float32)
+        n = len(self._groups)
+        return np.log((1 + n) / (1 + self._df)).astype(np.float32) + 1
+
+    def similarities(self, error: str) -> np.ndarray:
+        """Coseno entre el error y cada fila, en un solo producto matriz-vector.
+
+        Las filas guardadas sin rollup en esta sesion valen -1 y no superan ningun umbral.
+        """
+        n = self._stored
+        if not self._groups:
+            return np.zeros(0, dtype=np.float32)
+        weights = self._weights() ** 2
+        matrix = self._matrix[:n]
+        if self._norms is None:
+            self._norms = np.sqrt((matrix * matrix) @ weights)
+        query = self.encoder(canonicalize(error))
+        query_norm = np.sqrt((query * query) @ weights)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = (matrix @ (query * weights)) / (self._norms * query_norm)
+        return np.where(self._active[:n], np.nan_to_num(scores), np.float32(-1))
+
+    def rank(self, error: str, k: int = 5, weighted: bool = True) -> List[Tuple[int, float]]:
+        """Top-k (fila, coseno); con 'weighted' ordena ponderando por tasa de exito y antiguedad."""
+        similarity = self.similarities(error)
+        n = len(similarity)
+        if not n:
+            return []
+        score = similarity
+        if weighted:
+            success = (self._successes[:n] + 1) / (self._totals[:n] + 2)
+            age_days = np.maximum(datetime.now().timestamp() - self._last_seen[:n], 0) / 86400
+            recency = 0.5 ** (age_days / self.half_life_days)
+            score = similarity * (0.5 + 0.5 * success) * (0.5 + 0.5 * recency)
+        top = np.argpartition(-score, k - 1)[:k] if n > k else np.arange(n)
+        top = top[np.argsort(-score[top], kind="stable")]
+        return [(int(row), float(similarity[row])) for row in top]
+
+    def best_match(self, error: str, threshold: float) -> Optional[int]:
+        """Posicion del rollup mas reciente del mejor grupo por encima del umbral."""
+        for row, similarity in self.rank(error):
+            if similarity >= threshold:
+                return int(self._latest[row])
+        return None
+
+    def failed_commands(self, error: str, threshold: float, k: int = 5) -> Set[str]:
+        failed: Set[str] = set()
+        for row, similarity in self.rank(error, k, weighted=False):
+            if similarity >= threshold:
+                failed |= self._failed[row]
+        return failed
+
+    def flush(self):
+        if self._matrix is not None:
+            self._matrix.flush()
+            self._keys.flush()
@@ -0,0 +1,151 @@
+import hashlib
+import math
+import re
+import time
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+from llama_index.core.bridge.pydantic import PrivateAttr
+from llama_index.core.embeddings import BaseEmbedding
+from llama_index.core.postprocessor.types import BaseNodePostprocessor
+from llama_index.core.schema import BaseNode, NodeWithScore, QueryBundle
+from llama_index.core.vector_stores.types import BasePydanticVectorStore, VectorStoreQuery, VectorStoreQueryResult
+
+_WORDS = re.compile(r"\w+", re.UNICODE)
+_SERVICE = re.compile(r"Servicio afectado: (\S+)")
+_QUESTION = re.compile(r"User question: (.+)", re.DOTALL)
+
+Responder = Callable[[List[Tuple[str, str]]], str]
+
+
+def tokenize(text: str) -> List[str]:
+    return [w.lower() for w in _WORDS.findall(text or "")]
+
+
+def default_responder(messages: List[Tuple[str, str]]) -> str:
+    """Respuestas estables segun el tipo de prompt (plan, reescritura o diagnostico)."""
+    prompt = "\n".join(content for _, content in messages)
+    if "comandos de shell" in prompt:
+        service = _SERVICE.search(prompt)
+        return f"sudo service {service.group(1) if service else 'app'} restart"
+    question = _QUESTION.search(prompt)
+    if question:
+        text = question.group(1).strip()
+        return "\n".join(f"{text} {suffix}" for suffix in ("docs", "documentacion", "seccion", "parametros", "alternativa"))
+    digest = hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:8]
+    return f"Diagnostico simulado {digest}: el servicio no responde; reiniciarlo deberia resolverlo."
+
+
+class _Message:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class FakeChatModel:
+    """Sustituto determinista de ChatOpenAI: misma entrada, misma salida, sin red.
+
+    'responder' decide el texto a partir de los mensajes (rol, contenido) y
+    'latency' simula el tiempo de respuesta del proveedor.
+    """
+
+    def __init__(self, responder: Optional[Responder] = None, latency: float = 0.0, model_name: str = "fake-chat"):
+        self.responder = responder or default_responder
+        self.latency = latency
+        self.model_name = model_name
+        self.calls = 0
+
+    def _respond(self, messages: Sequence) -> str:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return self.responder([(m.type, m.content) if hasattr(m, "type") else (m[0], m[1]) for m in messages])
+
+    def invoke(self, messages: Sequence) -> _Message:
+        return _Message(self._respond(messages))
+
+    def stream(self, messages: Sequence) -> Iterator[_Message]:
+        for word in re.split(r"(?<= )", self._respond(messages)):
+            yield _Message(word)
+
+
+class FakeEmbedding(BaseEmbedding):
+    """Embeddings deterministas: bolsa de palabras con hashing, normalizada."""
+
+    embed_dim: int = 1536
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "FakeEmbedding"
+
+    def _vector(self, text: str) -> List[float]:
+        vector = np.zeros(self.embed_dim, dtype=np.float32)
+        for word in tokenize(text):
+            slot = int.from_bytes(hashlib.md5(word.encode("utf-8")).digest()[:4], "little")
+            vector[slot % self.embed_dim] += 1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        return self._vector(query)
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._vector(text)
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        return self._vector(query)
+
+    async def _aget_text_embedding(self, text: str) -> List[float]:
+        return self._vector(text)
+
+
+class FakeReranker(BaseNodePostprocessor):
+    """Sustituto de CohereRerank: ordena por palabras compartidas con la consulta."""
+
+    top_n: int = 5
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "FakeReranker"
+
+    def _postprocess_nodes(self, nodes: List[NodeWithScore], query_bundle: Optional[QueryBundle] = None) -> List[NodeWithScore]:
+        query = set(tokenize(query_bundle.query_str if query_bundle else ""))
+        scored = []
+        for node in nodes:
+            words = tokenize(node.node.get_content())
+            score = len(query & set(words)) / math.sqrt(len(words) or 1)
+            scored.append(NodeWithScore(node=node.node, score=score))
+        scored.sort(key=lambda n: (-n.score, n.node.node_id))
+        return scored[:self.top_n]
+
+
+class FakeVectorStore(BasePydanticVectorStore):
+    """Sustituto en memoria del indice de Pinecone (similitud coseno exacta)."""
+
+    stores_text: bool = True
+    _nodes: List[BaseNode] = PrivateAttr(default_factory=list)
+    _matrix: Any = PrivateAttr(default=None)
+
+    @property
+    def client(self) -> None:
+        return None
+
+    def add(self, nodes: List[BaseNode], **kwargs: Any) -> List[str]:
+        vectors = np.array([node.get_embedding() for node in nodes], dtype=np.float32)
+        self._matrix = vectors if self._matrix is None else np.vstack([self._matrix, vectors])
+        self._nodes.extend(nodes)
+        return [node.node_id for node in nodes]
+
+    def delete(self, ref_doc_id: str, **kwargs: Any) -> None:
+        keep = [i for i, node in enumerate(self._nodes) if node.ref_doc_id != ref_doc_id]
+        self._nodes = [self._nodes[i] for i in keep]
+        self._matrix = self._matrix[keep] if keep else None
+
+    def query(self, query: VectorStoreQuery, **kwargs: Any) -> VectorStoreQueryResult:
+        if self._matrix is None or query.query_embedding is None:
+            return VectorStoreQueryResult(nodes=[], similarities=[], ids=[])
+        scores = self._matrix @ np.asarray(query.query_embedding, dtype=np.float32)
+        top = np.argsort(-scores, kind="stable")[:query.similarity_top_k]
+        return VectorStoreQueryResult(
+            nodes=[self._nodes[i] for i in top],
+            similarities=[float(scores[i]) for i in top],
+            ids=[self._nodes[i].node_id for i in top]
+        )
@@ -0,0 +1,69 @@
+import hashlib
+import re
+from functools import lru_cache
+
+# Orden de prioridad: en una misma posicion gana la primera regla que casa.
+_RULES = (
+    ("url", r"[a-z][a-z0-9+.\-]*://[^\s'\"]+", "<url>"),
+    ("timestamp", r"\d{4}-\d{2}-\d{2}[t ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:z|[+\-]\d{2}:?\d{2})?", "<ts>"),
+    ("syslog_time", r"\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\s+\d{1,2}\s+\d{2}:\d{2}:\d{2}", "<ts>"),
+    ("clock", r"\b\d{2}:\d{2}:\d{2}(?:[.,]\d+)?\b", "<ts>"),
+    ("date", r"\b\d{4}-\d{2}-\d{2}\b", "<ts>"),
+    ("uuid", r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", "<uuid>"),
+    ("mac", r"\b(?:[0-9a-f]{2}:){5}[0-9a-f]{2}\b", "<mac>"),
+    ("ipv4", r"\b\d{1,3}(?:\.\d{1,3}){3}(?::\d{1,5})?\b", "<ip>"),
+    ("ipv6", r"\[?\b[0-9a-f]{1,4}(?::[0-9a-f]{0,4}){2,7}\b\]?(?::\d{1,5})?|\[?::1\]?(?::\d{1,5})?", "<ip>"),
+    ("hex", r"\b0x[0-9a-f]+\b|\b(?=[0-9a-f]*\d)(?=[0-9a-f]*[a-f])[0-9a-f]{8,}\b", "<hex>"),
+    ("path_line", r"(?<![\w.~])(?:/[\w.@+\-]+)+:\d+(?::\d+)?", "<path>:<line>"),
+    ("path", r"(?<![\w.~])(?:/[\w.@+\-]+)+/?", "<path>"),
+    ("pid", r"\bpid[\s=:]*\d+", "pid <pid>"),
+    ("process", r"\bprocess\s+\d+", "process <pid>"),
+    ("bracket_pid", r"\[\d+\]", "[<pid>]"),
+    ("port", r"\bport[\s=:]*\d+", "port <port>"),
+    ("host_port", r"(?<=[a-z]):\d{2,5}\b", ":<port>"),
+    ("assignment", r"(?<==)(?<!status=)(?<!code=)(?<!errno=)[+\-]?\d+(?:\.\d+)?(?:e[+\-]?\d+)?", "<v>"),
+    ("ewma", r"\bewma\s+[+\-]?\d+(?:\.\d+)?(?:e[+\-]?\d+)?", "ewma <v>"),
+    ("mean", r"\bmedia\s+[+\-]?\d+(?:\.\d+)?(?:e[+\-]?\d+)?", "media <v>"),
+    ("duration", r"\b\d+(?:\.\d+)?(?:ms|us|s|m|h)\b", "<dur>"),
+    ("size", r"\b\d+(?:\.\d+)?(?:[kmgt]i?b|b)\b", "<size>"),
+    ("number", r"\b\d{4,}\b|\b\d+\.\d+\b", "<n>"),
+)
+
+_MASK = re.compile("|".join(f"(?P<{name}>{pattern})" for name, pattern, _ in _RULES))
+_REPLACEMENTS = {name: replacement for name, _, replacement in _RULES}
+# Todo token volatil lleva un digito o una barra; las reglas solo se prueban
+# sobre esos tokens (con la palabra que los introduce) y no en cada posicion.
+_CANDIDATE = re.compile(
+    r"(?:(?:pid|process|port|ewma|media)[\s=:]*|(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\s+\d{1,2}\s+"
+    r"|\d{4}-\d{2}-\d{2} )?\S*[\d/]\S*"
+)
+_SPACES = re.compile(r"\s+")
+
+
+def _replace(match: re.Match) -> str:
+    return _REPLACEMENTS[match.lastgroup]
+
+
+def _mask(match: re.Match) -> str:
+    token = match.group()
+    if token.isdigit():
+        return "<n>" if len(token) > 3 else token
+    return _MASK.sub(_replace, token)
+
+
+@lru_cache(maxsize=8192)
+def canonicalize(text: str) -> str:
+    """Forma canonica de un error o salida de comando, sin los tokens volatiles.
+
+    Los pids, puertos, marcas de tiempo, rutas, direcciones, ids hex y los
+    valores de metricas ('clave=valor', EWMA, media) se sustituyen por
+    marcadores; los demas numeros cortos (codigos de salida y 'status=',
+    errno, estados HTTP, umbrales) se conservan porque distinguen causas.
+    """
+    return _SPACES.sub(" ", _CANDIDATE.sub(_mask, (text or "").lower())).strip()
+
+
+@lru_cache(maxsize=8192)
+def signature(text: str) -> str:
+    """Hash estable y corto de la forma canonica, para indexar episodios por igualdad."""
+    return hashlib.blake2b(canonicalize(text or "").encode("utf-8"), digest_size=8).hexdigest()
@@ -1,43 +1,25 @@
 import os
-from pinecone import Pinecone, ServerlessSpec
-from llama_index.core import VectorStoreIndex, SimpleDirectoryReader, StorageContext
-from llama_index.vector_stores.pinecone import PineconeVectorStore
-from llama_index.embeddings.openai import OpenAIEmbedding
-from llama_index.llms.openai import OpenAI
-from llama_index.postprocessor.cohere_rerank import CohereRerank
-from llama_parse import LlamaParse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
 from src.core.config import config
 from src.core.event_bus import log
+from src.core.llm import llm_client
+from src.core import providers
+from src.core.tracing import tracer
 
 
 class VectorKnowledgeBase:
     def __init__(self):
-        self.pc = Pinecone(api_key=config.PINECONE_API_KEY)
         self.index_name = config.PINECONE_INDEX_NAME
-        self.ensure_index_exists()
-        self.vector_store = PineconeVectorStore(pinecone_index=self.pc.Index(self.index_name))
-        self.embed_model = OpenAIEmbedding(model=config.EMBEDDING_MODEL)
-        self.llm = OpenAI(model=config.MODEL_NAME, temperature=config.TEMPERATURE)
-        self.reranker = CohereRerank(
-            api_key=config.COHERE_API_KEY,
-            top_n=5
-        )
+        self.vector_store = providers.vector_store(self.index_name)
+        self.embed_model = providers.embedding_model()
+        self.reranker = providers.reranker(top_n=5)
         self.index = None
 
-    def ensure_index_exists(self):
-        existing_indexes = [i.name for i in self.pc.list_indexes()]
-        if self.index_name not in existing_indexes:
-            print(f"[RAG] Creando indice en Pinecone: {self.index_name}")
-            self.pc.create_index(
-                name=self.index_name,
-                dimension=config.EMBEDDING_DIM,
-                metric="cosine",
-                spec=ServerlessSpec(cloud="aws", region="us-east-1")
-            )
-        else:
-            print(f"[RAG] Indice existente: {self.index_name}")
-
     def ingest_manuals(self):
+        from llama_index.core import VectorStoreIndex, SimpleDirectoryReader, StorageContext
+        from llama_parse import LlamaParse
         print("[RAG] Iniciando ingesta de manuales con LlamaParse...")
         parser = LlamaParse(
             api_key=config.LLAMA_CLOUD_API_KEY,
@@ -64,6 +46,8 @@ class VectorKnowledgeBase:
         print("[RAG] Ingesta completada.")
 
     def ingest_file(self, filepath: str):
+        from llama_index.core import SimpleDirectoryReader
+        from llama_parse import LlamaParse
         print(f"[RAG] Ingesta incremental: {os.path.basename(filepath)}")
         if filepath.endswith(".pdf"):
             parser = LlamaParse(
@@ -86,16 +70,11 @@ class VectorKnowledgeBase:
         splitter = SentenceSplitter(chunk_size=1024, chunk_overlap=200)
         nodes = splitter.get_nodes_from_documents(documents)
 
-        if not self.index:
-            self.index = VectorStoreIndex.from_vector_store(
-                self.vector_store,
-                embed_model=self.embed_model
-            )
-
+        self._ensure_index()
         self.index.insert_nodes(nodes)
         print(f"[RAG] {len(nodes)} nodos insertados en Pinecone.")
 
-    def _rewrite_query(self, query_text: str, llm) -> list:
+    def _rewrite_query(self, query_text: str) -> list:
         rewrite_prompt = (
             "You are a search query optimizer for technical documentation about PostgreSQL, Docker, and Nginx.\n"
             "The documents are written in BOTH English and Spanish.\n"
@@ -109,32 +88,56 @@ class VectorKnowledgeBase:
             "Return ONLY the 5 queries, one per line, no numbering, no explanation.\n\n"
             f"User question: {query_text}"
         )
-        response = llm.complete(rewrite_prompt)
-        queries = [q.strip() for q in str(response).strip().split("\n") if q.strip()]
+        response = llm_client.complete([("user", rewrite_prompt)])
+        queries = [q.strip() for q in response.strip().split("\n") if q.strip()]
         queries.insert(0, query_text)
         return queries[:6]
 
-    def query(self, query_text: str) -> str:
+    def _ensure_index(self):
+        from llama_index.core import VectorStoreIndex
         if not self.index:
             self.index = VectorStoreIndex.from_vector_store(
                 self.vector_store,
                 embed_model=self.embed_model
             )
 
-        search_queries = self._rewrite_query(query_text, self.llm)
+    def retrieve(self, query_text: str, timings: Optional[Dict[str, float]] = None) -> List:
+        """Reescritura, busqueda y rerank, devolviendo los fragmentos tal cual.
 
+        La busqueda de la pregunta original corre mientras el LLM reescribe la
+        consulta, y las busquedas reescritas se lanzan en paralelo.
+        """
+        timings = {} if timings is None else timings
+        self._ensure_index()
         retriever = self.index.as_retriever(similarity_top_k=5)
-        all_nodes = []
-        seen_ids = set()
-        for sq in search_queries:
-            nodes = retriever.retrieve(sq)
-            for node in nodes:
-                if node.node_id not in seen_ids:
-                    seen_ids.add(node.node_id)
-                    all_nodes.append(node)
 
+        with ThreadPoolExecutor(max_workers=6, thread_name_prefix="rag") as pool:
+            start = time.perf_counter()
+            original = pool.submit(retriever.retrieve, query_text)
+            search_queries = self._rewrite_query(query_text)
+            timings["rewrite_ms"] = (time.perf_counter() - start) * 1000
+
+            with tracer.span("rag", "retrieve", queries=len(search_queries)) as span:
+                results = [original] + [pool.submit(retriever.retrieve, sq) for sq in search_queries[1:]]
+                all_nodes = []
+                seen_ids = set()
+                for future in results:
+                    for node in future.result():
+                        if node.node_id not in seen_ids:
+                            seen_ids.add(node.node_id)
+                            all_nodes.append(node)
+                span.attributes["chunks"] = len(all_nodes)
+            timings["retrieve_ms"] = (time.perf_counter() - start) * 1000 - timings["rewrite_ms"]
+
+        start = time.perf_counter()
         english_query = search_queries[1] if len(search_queries) > 1 else query_text
-        reranked_nodes = self.reranker.postprocess_nodes(all_nodes, query_str=english_query)
+        with tracer.span("rag", "rerank", candidates=len(all_nodes)):
+            reranked_nodes = self.reranker.postprocess_nodes(all_nodes, query_str=english_query)
+        timings["rerank_ms"] = (time.perf_counter() - start) * 1000
+        return reranked_nodes
+
+    def query(self, query_text: str) -> str:
+        reranked_nodes = self.retrieve(query_text)
 
         context_str = "\n\n---\n\n".join([node.get_content() for node in reranked_nodes])
 
@@ -155,8 +158,7 @@ class VectorKnowledgeBase:
             "   'No encontre informacion especifica sobre eso en los documentos cargados.'\n"
         )
 
-        response = self.llm.complete(qa_template_str)
-        final_response = str(response)
+        final_response = llm_client.complete([("user", qa_template_str)])
 
         sources = []
         for node in reranked_nodes:
@@ -173,28 +175,8 @@ class VectorKnowledgeBase:
         """Generates a stream of events and content for the chat UI."""
         yield {"event": "thinking", "data": "Analizando tu pregunta..."}
         
-        if not self.index:
-            self.index = VectorStoreIndex.from_vector_store(
-                self.vector_store,
-                embed_model=self.embed_model
-            )
-
-        yield {"event": "thinking", "data": "Optimizando búsqueda..."}
-        search_queries = self._rewrite_query(query_text, self.llm)
-
-        yield {"event": "thinking", "data": "Consultando base de conocimiento vectorizada..."}
-        retriever = self.index.as_retriever(similarity_top_k=5)
-        all_nodes = []
-        seen_ids = set()
-        for sq in search_queries:
-            nodes = retriever.retrieve(sq)
-            for node in nodes:
-                if node.node_id not in seen_ids:
-                    seen_ids.add(node.node_id)
-                    all_nodes.append(node)
-
-        english_query = search_queries[1] if len(search_queries) > 1 else query_text
-        reranked_nodes = self.reranker.postprocess_nodes(all_nodes, query_str=english_query)
+        yield {"event": "thinking", "data": "Optimizando búsqueda y consultando base de conocimiento vectorizada..."}
+        reranked_nodes = self.retrieve(query_text)
 
         yield {"event": "thinking", "data": f"Leyendo {len(reranked_nodes)} fragmentos relevantes..."}
         context_str = "\n\n---\n\n".join([node.get_content() for node in reranked_nodes])
@@ -217,10 +199,10 @@ class VectorKnowledgeBase:
             "   'No encontre informacion especifica sobre eso en los documentos cargados.'\n"
         )
 
-        response_gen = self.llm.stream_complete(qa_template_str)
+        response_gen = llm_client.stream([("user", qa_template_str)])
         
         for delta in response_gen:
-            yield {"event": "message", "data": delta.delta}
+            yield {"event": "message", "data": delta}
 
         sources = []
         for node in reranked_nodes:
@@ -0,0 +1,279 @@
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Tuple
+from .config import config
+from . import providers
+from .llm_cache import Messages, cache_key, llm_cache
+from .tracing import Span, tracer
+
+_RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+_RETRYABLE_NAMES = ("RateLimit", "Timeout", "Connection", "InternalServer", "ServiceUnavailable")
+
+
+class _TokenBucket:
+    """Cubo de tokens que se rellena a 'per_minute' por minuto; 0 lo desactiva.
+
+    La capacidad es lo que se rellena en 'burst' segundos, asi que una rafaga
+    nunca supera ese volumen aunque el cubo lleve tiempo sin usarse.
+    """
+
+    def __init__(self, per_minute: float, burst: float = 1.0):
+        self.per_minute = per_minute
+        self.rate = per_minute / 60.0
+        self.capacity = self.rate * burst
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1) -> float:
+        """Bloquea hasta tener 'amount' tokens y devuelve los segundos esperados."""
+        if not self.rate:
+            return 0.0
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return waited
+                delay = (amount - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+def as_messages(messages) -> List[Tuple[str, str]]:
+    """Acepta tuplas (rol, texto) o mensajes de LangChain."""
+    return [(m.type, m.content) if hasattr(m, "type") else (m[0], m[1]) for m in messages]
+
+
+def prompt_tokens(messages: Messages) -> int:
+    return sum(len(content) for _, content in messages) // 4
+
+
+def estimate_tokens(messages: Messages) -> int:
+    return prompt_tokens(messages) + config.LLM_OUTPUT_TOKENS
+
+
+def _retry_after(exc: Exception) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    value = getattr(response, "headers", {}).get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def is_retryable(exc: Exception) -> bool:
+    status = getattr(exc, "status_code", None) or getattr(getattr(exc, "response", None), "status_code", None)
+    if status is not None:
+        return status in _RETRYABLE_STATUS
+    return isinstance(exc, (ConnectionError, TimeoutError)) or any(n in type(exc).__name__ for n in _RETRYABLE_NAMES)
+
+
+def _percentiles(samples: Deque[float]) -> Dict[str, float]:
+    if not samples:
+        return {"p50": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(samples)
+    return {
+        "p50": round(ordered[len(ordered) // 2], 1),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1),
+        "max": round(ordered[-1], 1)
+    }
+
+
+def _record_usage(span: Span, response):
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        span.attributes["input_tokens"] = usage.get("input_tokens")
+        span.attributes["output_tokens"] = usage.get("output_tokens")
+
+
+@lru_cache(maxsize=None)
+def get_chat_model():
+    """Modelo de chat compartido (ChatOpenAI o el falso local); se construye en el primer uso.
+
+    Los reintentos los gestiona LLMClient, por eso el SDK no reintenta.
+    """
+    return providers.chat_model()
+
+
+class LLMClient:
+    """Fachada unica para todas las llamadas al LLM.
+
+    Limita peticiones y tokens por minuto con dos cubos de tokens, acota las
+    llamadas simultaneas, reintenta los errores transitorios con backoff
+    exponencial y jitter, y une las peticiones identicas en vuelo en una sola
+    llamada. Las respuestas pasan por llm_cache.
+    """
+
+    def __init__(self, model_factory: Callable = get_chat_model, max_concurrency: int = 8,
+                 requests_per_minute: float = 500, tokens_per_minute: float = 30000,
+                 max_retries: int = 4, retry_base_delay: float = 0.5, retry_max_delay: float = 20.0):
+        self.model_factory = model_factory
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self._requests = _TokenBucket(requests_per_minute)
+        self._tokens = _TokenBucket(tokens_per_minute, burst=10.0)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._latency: Deque[float] = deque(maxlen=512)
+        self._queue: Deque[float] = deque(maxlen=512)
+        self._metrics = {"requests": 0, "calls": 0, "coalesced": 0, "retries": 0, "failures": 0,
+                         "throttled": 0, "in_flight": 0, "queued": 0}
+
+    @property
+    def model(self):
+        return self.model_factory()
+
+    def _count(self, name: str, delta: int = 1):
+        with self._lock:
+            self._metrics[name] += delta
+
+    def _backoff(self, attempt: int, exc: Exception) -> float:
+        retry_after = _retry_after(exc)
+        if retry_after is not None:
+            return min(retry_after, self.retry_max_delay)
+        return random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt))
+
+    def _call(self, messages: Messages, call: Callable, span: Optional[Span] = None):
+        """Ejecuta 'call' respetando limites, concurrencia y reintentos."""
+        tokens = estimate_tokens(messages)
+        for attempt in range(self.max_retries + 1):
+            queued = time.perf_counter()
+            self._count("queued")
+            try:
+                throttled = self._requests.acquire() + self._tokens.acquire(tokens)
+                self._slots.acquire()
+            finally:
+                self._count("queued", -1)
+            if throttled:
+                self._count("throttled")
+            queue_ms = (time.perf_counter() - queued) * 1000
+            self._queue.append(queue_ms)
+            if span is not None:
+                span.attributes["queue_ms"] = round(span.attributes.get("queue_ms", 0) + queue_ms, 3)
+
+            self._count("in_flight")
+            self._count("calls")
+            start = time.perf_counter()
+            try:
+                result = call()
+                self._latency.append((time.perf_counter() - start) * 1000)
+                return result
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    self._count("failures")
+                    raise
+                delay = self._backoff(attempt, e)
+                self._count("retries")
+                if span is not None:
+                    span.attributes["retries"] = attempt + 1
+            finally:
+                self._count("in_flight", -1)
+                self._slots.release()
+            time.sleep(delay)
+
+    def complete(self, messages) -> str:
+        messages = as_messages(messages)
+        with tracer.span("llm", "complete", prompt_tokens=prompt_tokens(messages)) as span:
+            return self._complete(messages, span)
+
+    def _complete(self, messages: Messages, span: Span) -> str:
+        model = self.model
+        key = cache_key(model.model_name, messages)
+        self._count("requests")
+        cached = llm_cache.get(key)
+        if cached is not None:
+            span.attributes["source"] = "cache"
+            return cached
+
+        with self._lock:
+            leader = self._inflight.get(key)
+            if leader is None:
+                future = self._inflight[key] = Future()
+        if leader is not None:
+            self._count("coalesced")
+            span.attributes["source"] = "coalesced"
+            return leader.result()
+
+        span.attributes["source"] = "model"
+        try:
+            response = self._call(messages, lambda: model.invoke(messages), span)
+            text = response.content
+            _record_usage(span, response)
+            llm_cache.put(key, model.model_name, text)
+            future.set_result(text)
+            return text
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def stream(self, messages) -> Iterator[str]:
+        """Streaming con los mismos limites; se reintenta solo antes del primer fragmento.
+
+        Los streams no se unen entre si: cada cliente consume su propio flujo.
+        """
+        messages = as_messages(messages)
+        model = self.model
+        self._count("requests")
+
+        def call():
+            chunks = model.stream(messages)
+            first = next(chunks, None)
+            return first, chunks
+
+        def generate():
+            span = tracer.start("llm", "stream", prompt_tokens=prompt_tokens(messages), source="model")
+            try:
+                first, chunks = self._call(messages, call, span)
+                if first is None:
+                    return
+                span.attributes["first_chunk_ms"] = round(span.duration_ms, 3)
+                yield first.content
+                for chunk in chunks:
+                    _record_usage(span, chunk)
+                    yield chunk.content
+            finally:
+                tracer.finish(span)
+
+        return llm_cache.stream(model.model_name, messages, generate)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            metrics = dict(self._metrics)
+            latency, queue = deque(self._latency), deque(self._queue)
+        return {
+            **metrics,
+            "max_concurrency": self.max_concurrency,
+            "requests_per_minute": self._requests.per_minute,
+            "tokens_per_minute": self._tokens.per_minute,
+            "latency_ms": _percentiles(latency),
+            "queue_ms": _percentiles(queue)
+        }
+
+
+llm_client = LLMClient(
+    max_concurrency=config.LLM_MAX_CONCURRENCY,
+    requests_per_minute=config.LLM_REQUESTS_PER_MINUTE,
+    tokens_per_minute=config.LLM_TOKENS_PER_MINUTE,
+    max_retries=config.LLM_MAX_RETRIES,
+    retry_base_delay=config.LLM_RETRY_BASE_DELAY,
+    retry_max_delay=config.LLM_RETRY_MAX_DELAY
+)
+
+
+def chat_completion(messages) -> str:
+    return llm_client.complete(messages)
@@ -0,0 +1,188 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from .config import config
+
+Messages = Sequence[Tuple[str, str]]
+
+_SPACES = re.compile(r"[ \t]+")
+
+
+def normalize_messages(messages: Messages) -> List[Tuple[str, str]]:
+    return [(role, "\n".join(_SPACES.sub(" ", line).strip() for line in content.strip().splitlines()))
+            for role, content in messages]
+
+
+def cache_key(model: str, messages: Messages, kind: str = "text") -> str:
+    payload = json.dumps([model, kind, normalize_messages(messages)], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """Cache de respuestas LLM: LRU en memoria delante de un almacen SQLite.
+
+    Las entradas caducan tras 'ttl' segundos y el fichero se recorta por
+    ultimo acceso cuando supera 'max_bytes'. Las respuestas en streaming se
+    guardan como lista de fragmentos para poder reproducirlas tal cual.
+    """
+
+    def __init__(self, path: str, memory_entries: int = 256, max_bytes: int = 64 * 1024 * 1024,
+                 ttl: float = 86400, enabled: bool = True):
+        self.path = path
+        self.memory_entries = memory_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.enabled = enabled
+        self._memory: "OrderedDict[str, Tuple[float, Union[str, List[str]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disk_bytes = 0
+        self._metrics = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "expired": 0, "evictions": 0, "writes": 0}
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(
+                """
+                PRAGMA journal_mode=WAL;
+                PRAGMA synchronous=NORMAL;
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    model TEXT,
+                    value TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    accessed REAL NOT NULL,
+                    size INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed);
+                """
+            )
+            self._disk_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        return self._conn
+
+    def _remember(self, key: str, created: float, value: Union[str, List[str]]):
+        self._memory[key] = (created, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Union[str, List[str]]]:
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached and now - cached[0] <= self.ttl:
+                self._memory.move_to_end(key)
+                self._metrics["memory_hits"] += 1
+                return cached[1]
+
+            db = self._db()
+            row = db.execute("SELECT value, created FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row and now - row[1] <= self.ttl:
+                db.execute("UPDATE llm_cache SET accessed = ? WHERE key = ?", (now, key))
+                db.commit()
+                value = json.loads(row[0])
+                self._remember(key, row[1], value)
+                self._metrics["disk_hits"] += 1
+                return value
+
+            if row or cached:
+                self._metrics["expired"] += 1
+                self._memory.pop(key, None)
+                self._delete(db, [key])
+                db.commit()
+            self._metrics["misses"] += 1
+            return None
+
+    def _delete(self, db: sqlite3.Connection, keys: List[str]):
+        placeholders = ", ".join("?" * len(keys))
+        freed = db.execute(f"SELECT COALESCE(SUM(size), 0) FROM llm_cache WHERE key IN ({placeholders})", keys).fetchone()[0]
+        db.execute(f"DELETE FROM llm_cache WHERE key IN ({placeholders})", keys)
+        self._disk_bytes -= freed
+
+    def put(self, key: str, model: str, value: Union[str, List[str]]):
+        if not self.enabled:
+            return
+        now = time.time()
+        data = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            db = self._db()
+            self._delete(db, [key])
+            db.execute("INSERT INTO llm_cache VALUES (?, ?, ?, ?, ?, ?)", (key, model, data, now, now, len(data)))
+            self._disk_bytes += len(data)
+            self._remember(key, now, value)
+            self._metrics["writes"] += 1
+            if self._disk_bytes > self.max_bytes:
+                self._evict(db, now)
+            db.commit()
+
+    def _evict(self, db: sqlite3.Connection, now: float):
+        db.execute("DELETE FROM llm_cache WHERE created < ?", (now - self.ttl,))
+        self._disk_bytes = db.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        target = self.max_bytes * 0.9
+        for key, size in db.execute("SELECT key, size FROM llm_cache ORDER BY accessed").fetchall():
+            if self._disk_bytes <= target:
+                break
+            db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self._memory.pop(key, None)
+            self._disk_bytes -= size
+            self._metrics["evictions"] += 1
+
+    def complete(self, model: str, messages: Messages, call: Callable[[], str]) -> str:
+        key = cache_key(model, messages)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        text = call()
+        self.put(key, model, text)
+        return text
+
+    def stream(self, model: str, messages: Messages, call: Callable[[], Iterable[str]]) -> Iterator[str]:
+        key = cache_key(model, messages, kind="stream")
+        cached = self.get(key)
+        if cached is not None:
+            yield from cached
+            return
+        chunks = []
+        for chunk in call():
+            chunks.append(chunk)
+            yield chunk
+        self.put(key, model, chunks)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            db = self._db()
+            db.execute("DELETE FROM llm_cache")
+            db.commit()
+            self._disk_bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self._metrics["memory_hits"] + self._metrics["disk_hits"] + self._metrics["misses"]
+        hits = self._metrics["memory_hits"] + self._metrics["disk_hits"]
+        return {
+            **self._metrics,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "disk_bytes": self._disk_bytes,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "enabled": self.enabled
+        }
+
+
+llm_cache = LLMCache(
+    path=config.LLM_CACHE_DB,
+    memory_entries=config.LLM_CACHE_MEMORY_ENTRIES,
+    max_bytes=config.LLM_CACHE_MAX_MB * 1024 * 1024,
+    ttl=config.LLM_CACHE_TTL,
+    enabled=config.LLM_CACHE_ENABLED
+)
@@ -1,83 +1,188 @@
-import json
 import os
+import sqlite3
+import threading
 from datetime import datetime
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 from src.core.config import config
+from src.core.fingerprint import canonicalize, signature as error_signature
+from src.core.episode_store import EpisodeStore
+from src.core.episode_index import KeywordIndex
 
 
 EPISODES_FILE = os.path.join(config.MEMORY_DIR, "episodes.json")
-
+EPISODES_DB = os.path.join(config.MEMORY_DIR, "episodes.sqlite")
+VECTORS_PATH = os.path.join(config.MEMORY_DIR, f"episode_vectors-{config.MEMORY_VECTORS}")
 
 class AgentMemory:
     def __init__(self):
         os.makedirs(config.MEMORY_DIR, exist_ok=True)
-        self.episodes = self._load()
-
-    def _load(self) -> List[Dict]:
-        if os.path.exists(EPISODES_FILE):
-            with open(EPISODES_FILE, "r") as f:
-                return json.load(f)
-        return []
-
-    def _save(self):
-        with open(EPISODES_FILE, "w") as f:
-            json.dump(self.episodes, f, indent=2, ensure_ascii=False)
-
-    def save_episode(self, error: str, diagnosis: str, command: str, result: str, success: bool):
+        self.store = EpisodeStore(EPISODES_DB, error_signature)
+        self._rollups: Optional[Dict[Tuple, Dict]] = None
+        self._by_position: Dict[int, Dict] = {}
+        self._by_signature: Dict[str, Dict] = {}
+        self._last_id = 0
+        self._lock = threading.Lock()
+        self._playbook: Dict[Tuple[str, Optional[str]], Dict[str, Dict]] = {}
+        self._keywords = KeywordIndex()
+        self._vectors = None
+        self.semantic = config.MEMORY_RETRIEVAL == "semantic"
+        self._compactor: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def rollups(self) -> List[Dict]:
+        with self._lock:
+            self._sync()
+            return list(self._rollups.values())
+
+    def _sync(self):
+        """Los rollups se leen del almacen en el primer acceso y luego solo los que cambiaron.
+
+        La posicion de cada rollup en los indices es el id de su ultimo
+        episodio, asi que el mas reciente de un grupo siempre es uno vigente.
+        """
+        if self._rollups is None:
+            migrated = self.store.import_json(EPISODES_FILE)
+            if migrated:
+                print(f"[MEMORIA] {migrated} episodios migrados desde {EPISODES_FILE}")
+            self._rollups = {}
+            if self.semantic:
+                self._vectors = self._vector_index()
+        last_id = self._last_id
+        for episode_id, rollup in self.store.read_rollups(self._last_id):
+            key = (rollup["service"], rollup["signature"], rollup["command"])
+            previous = self._rollups.get(key)
+            if previous is not None:
+                self._by_position.pop(previous["episode_id"], None)
+            self._rollups[key] = self._by_position[episode_id] = self._by_signature[rollup["signature"]] = rollup
+            self._keywords.add(episode_id, rollup)
+            if self._vectors is not None:
+                self._vectors.add(episode_id, rollup)
+            if rollup["command"]:
+                self._playbook.setdefault((rollup["signature"], rollup["service"]), {})[rollup["command"]] = rollup
+            self._last_id = episode_id
+        if self._vectors is not None and self._last_id != last_id:
+            self._vectors.flush()
+
+    def _vector_index(self):
+        import numpy as np
+        from src.core.episode_vectors import VectorIndex
+        if config.MEMORY_VECTORS == "embedding":
+            from src.core import providers
+            model = providers.embedding_model()
+            return VectorIndex(VECTORS_PATH, dim=config.EMBEDDING_DIM, mode="embedding",
+                               encoder=lambda text: np.asarray(model.get_text_embedding(text), dtype=np.float32),
+                               half_life_days=config.MEMORY_HALF_LIFE_DAYS,
+                               encoder_id=f"{config.PROVIDER}-{config.EMBEDDING_MODEL}")
+        return VectorIndex(VECTORS_PATH, dim=config.MEMORY_VECTOR_DIM, half_life_days=config.MEMORY_HALF_LIFE_DAYS)
+
+    def save_episode(self, error: str, diagnosis: str, command: str, result: str, success: bool,
+                     service: Optional[str] = None):
         episode = {
             "timestamp": datetime.now().isoformat(),
             "error": error,
+            "service": service,
             "diagnosis": diagnosis,
             "command": command,
             "result": result,
-            "success": success
+            "success": success,
+            "signature": error_signature(error or "")
         }
-        self.episodes.append(episode)
-        self._save()
+        self.store.append(episode)
         print(f"[MEMORIA] Episodio registrado: {'exitoso' if success else 'fallido'}")
 
     def find_similar(self, error: str) -> Optional[Dict]:
-        error_lower = error.lower()
-        error_keywords = set(error_lower.split())
-
-        best_match = None
-        best_score = 0
-
-        for ep in reversed(self.episodes):
-            ep_keywords = set(ep["error"].lower().split())
-            overlap = len(error_keywords & ep_keywords)
-            if overlap > best_score:
-                best_score = overlap
-                best_match = ep
-
-        if best_match and best_score >= 2:
-            return best_match
+        """El rollup mas reciente con la misma firma y, si no hay, el mas parecido."""
+        with self._lock:
+            self._sync()
+            exact = self._by_signature.get(error_signature(error or ""))
+            if exact is not None:
+                return dict(exact)
+            if self._vectors is not None:
+                position = self._vectors.best_match(error, config.MEMORY_SIMILAR_THRESHOLD)
+                return dict(self._by_position[position]) if position is not None else None
+            position, score = self._keywords.best_match(error)
+            if position is not None and score >= 2:
+                return dict(self._by_position[position])
         return None
 
     def get_failed_commands(self, error: str) -> List[str]:
-        error_lower = error.lower()
-        error_keywords = set(error_lower.split())
-        failed = set()
-
-        for ep in self.episodes:
-            if not ep["success"]:
-
-                ep_keywords = set(ep.get("error", "").lower().split())
-                if len(error_keywords & ep_keywords) >= 1:
-
-                    cmd = ep["command"].strip()
-                    failed.add(cmd)
-
-        return list(failed)
+        with self._lock:
+            self._sync()
+            if self._vectors is not None:
+                return list(self._vectors.failed_commands(error, config.MEMORY_FAILED_THRESHOLD, config.MEMORY_FAILED_TOP_K))
+            return list(self._keywords.failed_commands(error))
+
+    def find_playbook(self, error: str, service: Optional[str] = None) -> Optional[Dict]:
+        """Mejor comando conocido para esta firma de error y servicio.
+
+        La confianza sube con los exitos, baja con los fallos y decae con la
+        antiguedad del ultimo exito (vida media PLAYBOOK_HALF_LIFE_DAYS).
+        """
+        signature = error_signature(error or "")
+        with self._lock:
+            self._sync()
+            candidates = self._playbook.get((signature, service)) or self._playbook.get((signature, None)) or {}
+            candidates = {command: {field: rollup[field] for field in ("successes", "failures", "last_success")}
+                          for command, rollup in candidates.items()}
+        now = datetime.now()
+
+        best = None
+        for command, stats in candidates.items():
+            if not stats["successes"]:
+                continue
+            age_days = (now - datetime.fromisoformat(stats["last_success"])).total_seconds() / 86400
+            recency = 0.5 ** (age_days / config.PLAYBOOK_HALF_LIFE_DAYS)
+            confidence = stats["successes"] / (stats["successes"] + stats["failures"] + 1) * recency
+            if best is None or confidence > best["confidence"]:
+                best = {"command": command, "signature": signature, "fingerprint": canonicalize(error or ""),
+                        "confidence": round(confidence, 3), **stats}
+
+        if best and best["confidence"] >= config.PLAYBOOK_MIN_CONFIDENCE:
+            return best
+        return None
 
     def get_summary(self) -> str:
-        total = len(self.episodes)
-        successes = sum(1 for ep in self.episodes if ep["success"])
+        rollups = self.rollups
+        total = sum(rollup["count"] for rollup in rollups)
+        successes = sum(rollup["successes"] for rollup in rollups)
         failures = total - successes
-        return f"Total: {total} episodios, {successes} exitosos, {failures} fallidos"
-
-    def get_episodes(self) -> List[Dict]:
-        return self.episodes
+        return f"Total: {total} episodios ({len(rollups)} agrupados), {successes} exitosos, {failures} fallidos"
+
+    def get_rollups(self, limit: int = 200) -> List[Dict]:
+        """Rollups mas recientes primero."""
+        return sorted(self.rollups, key=lambda rollup: rollup["episode_id"], reverse=True)[:limit]
+
+    def get_episodes(self, limit: int = 100, signature: Optional[str] = None) -> List[Dict]:
+        return self.store.recent(limit, signature)
+
+    def compact(self) -> int:
+        removed = self.store.compact(config.MEMORY_RETENTION_DAYS, config.MEMORY_RETENTION_EPISODES)
+        if removed:
+            print(f"[MEMORIA] Compactacion: {removed} episodios crudos eliminados (los rollups se conservan)")
+        return removed
+
+    def _compact_loop(self):
+        while True:
+            try:
+                self.compact()
+            except sqlite3.Error as e:
+                print(f"[MEMORIA] Error compactando episodios: {e}")
+            if self._stop.wait(config.MEMORY_COMPACT_INTERVAL):
+                return
+
+    def start_compaction(self):
+        """Compacta los episodios crudos en segundo plano cada MEMORY_COMPACT_INTERVAL segundos."""
+        if self._compactor is None and config.MEMORY_COMPACT_INTERVAL > 0:
+            self._stop.clear()
+            self._compactor = threading.Thread(target=self._compact_loop, name="memory-compaction", daemon=True)
+            self._compactor.start()
+
+    def stop_compaction(self):
+        self._stop.set()
+        if self._compactor is not None:
+            self._compactor.join(timeout=5)
+            self._compactor = None
 
 
 memory = AgentMemory()
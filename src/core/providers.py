@@ -0,0 +1,56 @@
+from .config import config
+
+
+def use_fakes() -> bool:
+    return config.PROVIDER == "fake"
+
+
+def chat_model():
+    if use_fakes():
+        from .fakes import FakeChatModel
+        return FakeChatModel(latency=config.FAKE_LLM_LATENCY_MS / 1000)
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(
+        model=config.MODEL_NAME,
+        temperature=config.TEMPERATURE,
+        base_url=config.LLM_BASE_URL,
+        timeout=config.LLM_TIMEOUT,
+        max_retries=0
+    )
+
+
+def embedding_model():
+    if use_fakes():
+        from .fakes import FakeEmbedding
+        return FakeEmbedding(embed_dim=config.EMBEDDING_DIM)
+    from llama_index.embeddings.openai import OpenAIEmbedding
+    return OpenAIEmbedding(model=config.EMBEDDING_MODEL)
+
+
+def reranker(top_n: int = 5):
+    if use_fakes():
+        from .fakes import FakeReranker
+        return FakeReranker(top_n=top_n)
+    from llama_index.postprocessor.cohere_rerank import CohereRerank
+    return CohereRerank(api_key=config.COHERE_API_KEY, top_n=top_n)
+
+
+def vector_store(index_name: str):
+    if use_fakes():
+        from .fakes import FakeVectorStore
+        return FakeVectorStore()
+    from pinecone import Pinecone, ServerlessSpec
+    from llama_index.vector_stores.pinecone import PineconeVectorStore
+    pc = Pinecone(api_key=config.PINECONE_API_KEY)
+    existing_indexes = [i.name for i in pc.list_indexes()]
+    if index_name not in existing_indexes:
+        print(f"[RAG] Creando indice en Pinecone: {index_name}")
+        pc.create_index(
+            name=index_name,
+            dimension=config.EMBEDDING_DIM,
+            metric="cosine",
+            spec=ServerlessSpec(cloud="aws", region="us-east-1")
+        )
+    else:
+        print(f"[RAG] Indice existente: {index_name}")
+    return PineconeVectorStore(pinecone_index=pc.Index(index_name))
@@ -0,0 +1,164 @@
+import bisect
+import functools
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Tuple
+from .config import config
+from .event_bus import bus
+from .utils import current_run
+
+current_span: ContextVar = ContextVar("current_span", default=None)
+
+# Limites de cubeta en ms: crecimiento geometrico del 20% desde 0.05ms hasta ~1h.
+_BOUNDS = [0.05 * 1.2 ** i for i in range(100)]
+
+
+class Span:
+    __slots__ = ("span_id", "parent_id", "run_id", "kind", "name", "node", "start", "end", "attributes")
+
+    def __init__(self, kind: str, name: str, parent: Optional["Span"], attributes: Dict):
+        run = current_run.get()
+        self.span_id = uuid.uuid4().hex[:12]
+        self.parent_id = parent.span_id if parent else None
+        self.run_id = run.run_id if run else (parent.run_id if parent else None)
+        self.kind = kind
+        self.name = name
+        self.node = name if kind == "node" else (parent.node if parent else None)
+        self.start = time.time()
+        self.end: Optional[float] = None
+        self.attributes = attributes
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end or time.time()) - self.start) * 1000
+
+    def to_dict(self) -> Dict:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "run_id": self.run_id,
+            "kind": self.kind,
+            "name": self.name,
+            "node": self.node,
+            "start": self.start,
+            "end": self.end,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes
+        }
+
+
+class Histogram:
+    """Histograma de latencias con cubetas logaritmicas fijas (memoria constante)."""
+
+    def __init__(self):
+        self.counts = [0] * (len(_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, ms: float):
+        self.counts[bisect.bisect_left(_BOUNDS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(_BOUNDS[i] if i < len(_BOUNDS) else self.max, self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3) if self.count else 0.0,
+            "p50": round(self.percentile(0.5), 3),
+            "p95": round(self.percentile(0.95), 3),
+            "p99": round(self.percentile(0.99), 3),
+            "max": round(self.max, 3)
+        }
+
+
+class Tracer:
+    """Spans por nodo y por dependencia externa (SSH, LLM, RAG).
+
+    Cada span cerrado se publica en el bus de eventos con tipo 'span', se
+    acumula en un histograma por (tipo, nombre) y se guarda en un buffer
+    circular de los ultimos spans para reconstruir una ejecucion.
+    """
+
+    def __init__(self, enabled: bool = True, history: int = 2000):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._recent: Deque[Span] = deque(maxlen=history)
+
+    def start(self, kind: str, name: str, **attributes) -> Span:
+        """Abre un span sin activarlo en el contexto (p. ej. para generadores)."""
+        return Span(kind, name, current_span.get(), attributes)
+
+    def finish(self, span: Span):
+        span.end = time.time()
+        if not self.enabled:
+            return
+        ms = span.duration_ms
+        with self._lock:
+            self._histograms.setdefault((span.kind, span.name), Histogram()).record(ms)
+            self._recent.append(span)
+        bus.publish("span", f"{span.kind}:{span.name} {ms:.1f}ms", span.to_dict())
+
+    @contextmanager
+    def span(self, kind: str, name: str, **attributes) -> Iterator[Span]:
+        span = self.start(kind, name, **attributes)
+        token = current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.attributes["error"] = type(e).__name__
+            raise
+        finally:
+            current_span.reset(token)
+            self.finish(span)
+
+    def export(self) -> Dict[str, Dict[str, Dict]]:
+        """p50/p95/p99 por nodo ('nodes') y por dependencia externa ('dependencies')."""
+        with self._lock:
+            items = [(key, hist.summary()) for key, hist in self._histograms.items()]
+        result: Dict[str, Dict[str, Dict]] = {"nodes": {}, "dependencies": {}}
+        for (kind, name), summary in sorted(items):
+            if kind == "node":
+                result["nodes"][name] = summary
+            else:
+                result["dependencies"][f"{kind}:{name}"] = summary
+        return result
+
+    def spans(self, run_id: Optional[str] = None) -> List[Dict]:
+        with self._lock:
+            spans = list(self._recent)
+        return [s.to_dict() for s in spans if run_id is None or s.run_id == run_id]
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._recent.clear()
+
+
+tracer = Tracer(enabled=config.TRACING_ENABLED, history=config.TRACING_HISTORY)
+
+
+def traced_node(name: str, fn: Callable) -> Callable:
+    """Envuelve un nodo del grafo en un span de tipo 'node'."""
+    @functools.wraps(fn)
+    def wrapper(state):
+        with tracer.span("node", name, service=state.get("affected_service"), host=state.get("affected_host")):
+            return fn(state)
+    return wrapper
@@ -0,0 +1,77 @@
+import os
+import re
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+from .config import config
+
+_TRANSCRIPT_ID = re.compile(r"^[a-z]+-\d{8}-\d{6}-[0-9a-f]{8}$")
+
+
+class TranscriptStore:
+    """Transcripciones completas fuera del estado del agente, referenciadas por id.
+
+    Como los episodios crudos, caducan: cada 'prune_interval' segundos una
+    escritura borra las mas antiguas que 'max_age_days' y las que sobran por
+    encima de 'max_files'.
+    """
+
+    def __init__(self, directory: str, max_age_days: float = 30, max_files: int = 5000, prune_interval: float = 600):
+        self.directory = directory
+        self.max_age_days = max_age_days
+        self.max_files = max_files
+        self.prune_interval = prune_interval
+        self._last_prune = 0.0
+        self._lock = threading.Lock()
+
+    def save(self, kind: str, text: str) -> str:
+        Path(self.directory).mkdir(parents=True, exist_ok=True)
+        transcript_id = f"{kind}-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        with open(os.path.join(self.directory, f"{transcript_id}.log"), "w") as f:
+            f.write(text)
+        if time.monotonic() - self._last_prune >= self.prune_interval:
+            self.prune()
+        return transcript_id
+
+    def prune(self) -> int:
+        """Borra transcripciones por antiguedad y cantidad; un limite a 0 lo desactiva."""
+        with self._lock:
+            self._last_prune = time.monotonic()
+            entries = []
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.name.endswith(".log"):
+                        try:
+                            entries.append((entry.stat().st_mtime, entry.path))
+                        except FileNotFoundError:
+                            continue
+            entries.sort(reverse=True)
+            cutoff = time.time() - self.max_age_days * 86400 if self.max_age_days else None
+            expired = [path for i, (mtime, path) in enumerate(entries)
+                       if (cutoff is not None and mtime < cutoff) or (self.max_files and i >= self.max_files)]
+            removed = 0
+            for path in expired:
+                try:
+                    os.remove(path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+        if removed:
+            print(f"[TRANSCRIPCIONES] {removed} transcripciones antiguas eliminadas")
+        return removed
+
+    def load(self, transcript_id: str) -> Optional[str]:
+        if not _TRANSCRIPT_ID.match(transcript_id):
+            return None
+        path = os.path.join(self.directory, f"{transcript_id}.log")
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            return f.read()
+
+
+transcripts = TranscriptStore(config.TRANSCRIPTS_DIR, config.TRANSCRIPTS_RETENTION_DAYS, config.TRANSCRIPTS_MAX_FILES,
+                              config.TRANSCRIPTS_PRUNE_INTERVAL)
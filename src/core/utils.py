@@ -1,7 +1,9 @@
-from ..api.state import AGENT_STATE
+from contextvars import ContextVar
 
+current_run: ContextVar = ContextVar("current_run", default=None)
 
 
 def check_stop():
-    if AGENT_STATE.get("stop_requested"):
+    run = current_run.get()
+    if run is not None and run.stop_requested:
         raise RuntimeError("Agent stopped by user")
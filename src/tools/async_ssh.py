@@ -0,0 +1,321 @@
+import asyncio
+import concurrent.futures
+import threading
+import time
+from typing import Tuple, Optional, Dict, List, Callable, Coroutine, Any
+from ..core.config import config
+from ..core.utils import current_run
+from .output import OutputBuffer
+
+SUDO_PROMPT = "[sentinel-sudo]"
+READ_CHUNK = 32768
+
+
+class AsyncSSHClient:
+    def __init__(self, hostname: str, username: str, password: Optional[str] = None, key_filename: Optional[str] = None, port: int = 22,
+                 keepalive: int = 0):
+        self.hostname = hostname
+        self.username = username
+        self.password = password
+        self.key_filename = key_filename
+        self.port = port
+        self.keepalive = keepalive
+        self.conn = None
+        self.reconnects = 0
+        self._closed = True
+        self._lock = asyncio.Lock()
+
+    async def connect(self):
+        import asyncssh
+        try:
+            self.conn = await asyncssh.connect(
+                self.hostname,
+                port=self.port,
+                username=self.username,
+                password=self.password,
+                client_keys=[self.key_filename] if self.key_filename else None,
+                known_hosts=None,
+                keepalive_interval=self.keepalive,
+                connect_timeout=10
+            )
+            self._closed = False
+            asyncio.ensure_future(self.conn.wait_closed()).add_done_callback(self._on_closed)
+            print(f"[SSH] Conexion establecida con {self.username}@{self.hostname}:{self.port}")
+        except Exception as e:
+            print(f"[SSH] Error de conexion: {e}")
+            raise e
+
+    def _on_closed(self, _):
+        self._closed = True
+
+    def is_active(self) -> bool:
+        return self.conn is not None and not self._closed
+
+    async def reconnect(self):
+        print(f"[SSH] Reconectando con {self.username}@{self.hostname}:{self.port}")
+        await self.close()
+        self.reconnects += 1
+        await self.connect()
+
+    async def ensure_connected(self):
+        async with self._lock:
+            if not self.conn:
+                await self.connect()
+            elif not self.is_active():
+                await self.reconnect()
+
+    async def _open(self, command: str, term_type: Optional[str] = None):
+        import asyncssh
+        await self.ensure_connected()
+        try:
+            return await self.conn.create_process(command, term_type=term_type, encoding=None)
+        except (asyncssh.Error, OSError):
+            self._closed = True
+            await self.ensure_connected()
+            return await self.conn.create_process(command, term_type=term_type, encoding=None)
+
+    async def _pump(self, stream, buffer: OutputBuffer, stdin=None):
+        prompts_answered = 0
+        prompt = SUDO_PROMPT.encode()
+        while True:
+            data = await stream.read(READ_CHUNK)
+            if not data:
+                break
+            buffer.feed(data)
+            if stdin is not None and buffer.head.count(prompt) > prompts_answered:
+                if prompts_answered == 0:
+                    stdin.write(f"{self.password or ''}\n".encode())
+                else:
+                    stdin.write_eof()
+                prompts_answered += 1
+
+    async def execute_command(self, command: str, use_sudo: bool = False,
+                              on_line: Optional[Callable[[str], None]] = None,
+                              spill_path: Optional[str] = None, head_bytes: Optional[int] = None) -> Tuple[int, str, str]:
+        out = OutputBuffer(head_bytes or config.OUTPUT_HEAD_BYTES, config.OUTPUT_TAIL_BYTES, on_line=on_line,
+                           lines_per_sec=config.OUTPUT_LINES_PER_SEC, spill_path=spill_path)
+        err = OutputBuffer(head_bytes or config.OUTPUT_HEAD_BYTES, config.OUTPUT_TAIL_BYTES, on_line=on_line,
+                           lines_per_sec=config.OUTPUT_LINES_PER_SEC)
+
+        if use_sudo:
+            print(f"[SSH] Ejecutando (sudo): sudo -S {command}")
+            process = await self._open(f"sudo -S -p '{SUDO_PROMPT}' {command}", term_type="xterm")
+        else:
+            print(f"[SSH] Ejecutando: {command}")
+            process = await self._open(command)
+
+        try:
+            await asyncio.gather(
+                self._pump(process.stdout, out, process.stdin if use_sudo else None),
+                self._pump(process.stderr, err)
+            )
+            result = await process.wait()
+        except asyncio.CancelledError:
+            print(f"[SSH] Interrupcion solicitada. Cerrando canal.")
+            process.close()
+            raise
+        finally:
+            out.close()
+            err.close()
+
+        exit_code = result.exit_status if result.exit_status is not None else -1
+        out_text = out.text()
+        if use_sudo:
+            out_text = out_text.replace(SUDO_PROMPT, "")
+
+        return exit_code, out_text.strip(), err.text().strip()
+
+    async def close(self):
+        if self.conn:
+            self.conn.close()
+            await self.conn.wait_closed()
+
+
+class _AsyncPoolEntry:
+    def __init__(self, client: AsyncSSHClient, max_sessions: int):
+        self.client = client
+        self.sessions = asyncio.Semaphore(max_sessions)
+        self.in_use = 0
+        self.last_used = time.monotonic()
+
+
+class AsyncSSHPool:
+    """Conexiones asyncssh compartidas por (host, puerto, usuario).
+
+    Cada host tiene un semaforo que limita las sesiones concurrentes para no
+    superar el MaxSessions del servidor. Con max_connections conexiones en uso
+    las peticiones a hosts nuevos esperan hasta acquire_timeout.
+    """
+
+    def __init__(self, max_connections: int = 64, max_sessions_per_host: int = 8, idle_timeout: float = 300,
+                 keepalive: int = 30, acquire_timeout: float = 30):
+        self.max_connections = max_connections
+        self.max_sessions_per_host = max_sessions_per_host
+        self.idle_timeout = idle_timeout
+        self.keepalive = keepalive
+        self.acquire_timeout = acquire_timeout
+        self._entries: Dict[Tuple[str, int, str], _AsyncPoolEntry] = {}
+        self._cond = asyncio.Condition()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._retired_reconnects = 0
+
+    def _discard(self, key: Tuple[str, int, str]) -> Optional[AsyncSSHClient]:
+        """Saca la entrada del pool; el llamador cierra el cliente fuera del candado."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        self._retired_reconnects += entry.client.reconnects
+        self._evictions += 1
+        return entry.client
+
+    def _evict_idle(self) -> List[AsyncSSHClient]:
+        now = time.monotonic()
+        return [self._discard(key) for key, entry in list(self._entries.items())
+                if entry.in_use == 0 and now - entry.last_used > self.idle_timeout]
+
+    async def _checkout(self, hostname: str, port: int, username: str, password: Optional[str],
+                        key_filename: Optional[str]) -> _AsyncPoolEntry:
+        key = (hostname, port, username)
+        deadline = time.monotonic() + self.acquire_timeout
+        retired: List[AsyncSSHClient] = []
+        try:
+            async with self._cond:
+                retired += self._evict_idle()
+                while True:
+                    entry = self._entries.get(key)
+                    if entry:
+                        self._hits += 1
+                        break
+                    if len(self._entries) < self.max_connections:
+                        self._misses += 1
+                        client = AsyncSSHClient(hostname=hostname, port=port, username=username, password=password,
+                                                key_filename=key_filename, keepalive=self.keepalive)
+                        entry = self._entries[key] = _AsyncPoolEntry(client, self.max_sessions_per_host)
+                        break
+                    idle = [(e.last_used, k) for k, e in self._entries.items() if e.in_use == 0]
+                    if idle:
+                        retired.append(self._discard(min(idle)[1]))
+                        continue
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f"Pool SSH lleno ({self.max_connections} conexiones en uso)")
+                    try:
+                        await asyncio.wait_for(self._cond.wait(), remaining)
+                    except asyncio.TimeoutError:
+                        pass
+                entry.in_use += 1
+                return entry
+        finally:
+            for client in retired:
+                await client.close()
+
+    async def _checkin(self, entry: _AsyncPoolEntry):
+        entry.in_use -= 1
+        entry.last_used = time.monotonic()
+        async with self._cond:
+            self._cond.notify_all()
+
+    async def execute_command(self, hostname: str, port: int, username: str, command: str,
+                              password: Optional[str] = None, key_filename: Optional[str] = None,
+                              **kwargs) -> Tuple[int, str, str]:
+        entry = await self._checkout(hostname, port, username, password, key_filename)
+        try:
+            async with entry.sessions:
+                return await entry.client.execute_command(command, **kwargs)
+        finally:
+            await self._checkin(entry)
+
+    async def close_all(self):
+        async with self._cond:
+            retired = [self._discard(key) for key in list(self._entries)]
+        for client in retired:
+            await client.close()
+
+    def stats(self) -> Dict[str, int]:
+        reconnects = self._retired_reconnects + sum(e.client.reconnects for e in self._entries.values())
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "reconnects": reconnects,
+            "evictions": self._evictions,
+            "open": len(self._entries),
+            "in_use": sum(1 for e in self._entries.values() if e.in_use),
+            "max_connections": self.max_connections,
+            "max_sessions_per_host": self.max_sessions_per_host
+        }
+
+
+class SSHRuntime:
+    """Bucle de eventos dedicado a SSH, compartido por nodos (sincronos) y rutas (async).
+
+    Las corrutinas lanzadas con run() pertenecen a la ejecucion actual del
+    agente y se cancelan con cancel_agent(run_id), que sustituye al sondeo de
+    check_stop() dentro de SSH.
+    """
+
+    def __init__(self):
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.pool: Optional[AsyncSSHPool] = None
+        self._lock = threading.Lock()
+        self._agent_futures: Dict[concurrent.futures.Future, Optional[str]] = {}
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                threading.Thread(target=self.loop.run_forever, name="ssh-loop", daemon=True).start()
+                self.pool = AsyncSSHPool(
+                    max_connections=config.SSH_POOL_MAX_CONNECTIONS,
+                    max_sessions_per_host=config.SSH_MAX_SESSIONS_PER_HOST,
+                    idle_timeout=config.SSH_POOL_IDLE_TIMEOUT,
+                    keepalive=config.SSH_KEEPALIVE_INTERVAL,
+                    acquire_timeout=config.SSH_POOL_ACQUIRE_TIMEOUT
+                )
+            return self.loop
+
+    def run(self, coro: Coroutine) -> Any:
+        run = current_run.get()
+        future = asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+        self._agent_futures[future] = run.run_id if run else None
+        try:
+            return future.result()
+        except concurrent.futures.CancelledError:
+            raise RuntimeError("Agent stopped by user")
+        finally:
+            self._agent_futures.pop(future, None)
+
+    async def submit(self, coro: Coroutine) -> Any:
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()))
+
+    def cancel_agent(self, run_id: Optional[str] = None):
+        for future, owner in list(self._agent_futures.items()):
+            if run_id is None or owner == run_id:
+                future.cancel()
+
+    def shutdown(self):
+        if self.loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.pool.close_all(), self.loop).result(timeout=10)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    def stats(self) -> Dict[str, int]:
+        return self.pool.stats() if self.pool else {}
+
+
+ssh_runtime = SSHRuntime()
+
+
+async def execute(command: str, hostname: Optional[str] = None, port: Optional[int] = None,
+                  username: Optional[str] = None, password: Optional[str] = None,
+                  **kwargs) -> Tuple[int, str, str]:
+    ssh_runtime._ensure_loop()
+    return await ssh_runtime.pool.execute_command(
+        hostname or config.SSH_HOST,
+        port or config.SSH_PORT,
+        username or config.SSH_USER,
+        command,
+        password=password if password is not None else config.SSH_PASS,
+        **kwargs
+    )
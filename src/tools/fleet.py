@@ -0,0 +1,120 @@
+import asyncio
+import time
+from typing import Dict, Tuple, Optional, List, Union
+from ..core.config import config
+from ..core.tracing import tracer
+from .probe import probe_services
+from .metrics import metric_store, metric_checks, record_metrics
+
+
+class _HostRateLimiter:
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next = max(now, self._next) + self.interval
+
+
+class FleetScheduler:
+    """Reparte los sondeos de monitoreo entre todos los hosts del inventario.
+
+    Un semaforo global acota los sondeos simultaneos y cada host tiene su
+    propio limite de sondeos por segundo.
+    """
+
+    def __init__(self, max_workers: int = 32, host_rate: float = 2):
+        self.max_workers = max_workers
+        self.host_rate = host_rate
+        self._workers = asyncio.Semaphore(max_workers)
+        self._limiters: Dict[str, _HostRateLimiter] = {}
+
+    def _limiter(self, host_id: str) -> _HostRateLimiter:
+        if host_id not in self._limiters:
+            rate = config.HOSTS.get(host_id, {}).get("rate_limit", self.host_rate)
+            self._limiters[host_id] = _HostRateLimiter(rate)
+        return self._limiters[host_id]
+
+    async def probe_host(self, host_id: str, names: Optional[List[str]] = None) -> Union[Dict[str, Tuple[int, str, int]], Exception]:
+        services = config.host_services(host_id)
+        if names is not None:
+            services = {name: services[name] for name in names if name in services}
+        await self._limiter(host_id).wait()
+        checks = {**services, **metric_checks(services)}
+        async with self._workers:
+            with tracer.span("ssh", "probe", host=host_id, checks=len(checks)):
+                try:
+                    results = await probe_services(checks, **config.host_target(host_id))
+                except Exception as e:
+                    return e
+        record_metrics(host_id, services, results)
+        return results
+
+    async def probe_all(self, hosts: Optional[List[str]] = None) -> Dict[str, Union[Dict, Exception]]:
+        hosts = hosts or list(config.HOSTS)
+        results = await asyncio.gather(*[self.probe_host(h) for h in hosts])
+        return dict(zip(hosts, results))
+
+    async def probe_checks(self, checks: List[Tuple[str, str]]) -> Dict[str, Union[Dict, Exception]]:
+        by_host: Dict[str, List[str]] = {}
+        for host_id, name in checks:
+            by_host.setdefault(host_id, []).append(name)
+        results = await asyncio.gather(*[self.probe_host(h, names) for h, names in by_host.items()])
+        return dict(zip(by_host, results))
+
+
+def status_key(host_id: str, service: str) -> str:
+    if len(config.HOSTS) == 1:
+        return service
+    return f"{host_id}/{service}"
+
+
+def build_status_view(results: Dict[str, Union[Dict, Exception]]) -> Tuple[Dict[str, Dict], List[Tuple[str, str, str, str]]]:
+    """Une los resultados por host en una sola vista {host/servicio: estado}.
+
+    Un servicio activo cuyas metricas son anomalas se marca como 'degraded'.
+    Devuelve tambien la lista de fallos como (host, servicio, salida, error).
+    """
+    view = {}
+    failures = []
+    anomalies = metric_store.detect()
+    for host_id, host_results in results.items():
+        services = config.host_services(host_id)
+        if not isinstance(host_results, Exception):
+            services = {name: services[name] for name in host_results if name in services}
+        for name, cfg in services.items():
+            key = status_key(host_id, name)
+            if isinstance(host_results, Exception):
+                view[key] = {
+                    "status": "error",
+                    "details": f"SSH unavailable: {str(host_results)}",
+                    "type": cfg["type"],
+                    "host": host_id
+                }
+                continue
+
+            code, out, duration_ms = host_results.get(name, (-1, "", 0))
+            is_running = cfg["running_indicator"] in out
+            degraded = anomalies.get((host_id, name)) if is_running else None
+            view[key] = {
+                "status": "degraded" if degraded else "running" if is_running else "stopped",
+                "details": "; ".join(degraded) if degraded else out.strip() if not is_running else "Service is active",
+                "type": cfg["type"],
+                "host": host_id
+            }
+            if degraded:
+                failures.append((host_id, name, "; ".join(degraded), f"Servicio '{name}' degradado: {'; '.join(degraded)}"))
+            elif not is_running:
+                failures.append((host_id, name, out.strip(), f"Servicio '{name}' no esta activo."))
+    return view, failures
+
+
+fleet = FleetScheduler(max_workers=config.FLEET_MAX_WORKERS, host_rate=config.FLEET_HOST_RATE)
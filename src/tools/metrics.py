@@ -0,0 +1,171 @@
+import re
+import threading
+from typing import Dict, List, Tuple, Optional
+import numpy as np
+from ..core.config import config
+
+MetricKey = Tuple[str, str, str]
+
+METRIC_SEPARATOR = ":"
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?")
+
+
+class MetricStore:
+    """Series temporales de metricas en un ring buffer NumPy de tamano fijo.
+
+    Cada serie (host, servicio, metrica) ocupa una fila de una matriz
+    (series x ventana), asi que la memoria no crece con el tiempo de ejecucion.
+    Los detectores (umbral, z-score y EWMA) se evaluan sobre todas las series
+    a la vez con operaciones vectorizadas.
+    """
+
+    def __init__(self, window: int = 120, alpha: float = 0.3, zscore: float = 4.0, min_samples: int = 10):
+        self.window = window
+        self.alpha = alpha
+        self.zscore = zscore
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._keys: List[MetricKey] = []
+        self._index: Dict[MetricKey, int] = {}
+        self._values = np.full((0, window), np.nan)
+        self._heads = np.zeros(0, dtype=np.int64)
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._max = np.zeros(0)
+        self._min = np.zeros(0)
+        self._warn = np.zeros(0)
+        self._zlimit = np.zeros(0)
+        self._weights = alpha * (1 - alpha) ** np.arange(window)
+
+    def _grow(self):
+        capacity = max(8, 2 * len(self._heads))
+        rows = capacity - len(self._heads)
+        self._values = np.vstack([self._values, np.full((rows, self.window), np.nan)])
+        self._heads = np.concatenate([self._heads, np.zeros(rows, dtype=np.int64)])
+        self._counts = np.concatenate([self._counts, np.zeros(rows, dtype=np.int64)])
+        self._max = np.concatenate([self._max, np.full(rows, np.nan)])
+        self._min = np.concatenate([self._min, np.full(rows, np.nan)])
+        self._warn = np.concatenate([self._warn, np.full(rows, np.nan)])
+        self._zlimit = np.concatenate([self._zlimit, np.full(rows, np.nan)])
+
+    def _row(self, key: MetricKey) -> int:
+        row = self._index.get(key)
+        if row is None:
+            if len(self._keys) == len(self._heads):
+                self._grow()
+            row = len(self._keys)
+            self._keys.append(key)
+            self._index[key] = row
+        return row
+
+    def record(self, key: MetricKey, value: float, rule: Optional[Dict] = None):
+        rule = rule or {}
+        with self._lock:
+            row = self._row(key)
+            self._values[row, self._heads[row]] = value
+            self._heads[row] = (self._heads[row] + 1) % self.window
+            self._counts[row] += 1
+            self._max[row] = rule.get("max", np.nan)
+            self._min[row] = rule.get("min", np.nan)
+            self._warn[row] = rule.get("warn", np.nan)
+            zscore = rule.get("zscore", self.zscore)
+            self._zlimit[row] = np.nan if zscore is None else zscore
+
+    def _ordered(self) -> np.ndarray:
+        n = len(self._keys)
+        ages = np.arange(self.window)
+        index = (self._heads[:n, None] - 1 - ages[None, :]) % self.window
+        return np.take_along_axis(self._values[:n], index, axis=1)
+
+    def _evaluate(self):
+        series = self._ordered()
+        last = series[:, 0]
+
+        history = series[:, 1:]
+        valid = ~np.isnan(history)
+        samples = np.maximum(valid.sum(axis=1), 1)
+        mean = np.where(valid, history, 0).sum(axis=1) / samples
+        var = np.where(valid, (history - mean[:, None]) ** 2, 0).sum(axis=1) / samples
+        std = np.sqrt(var)
+
+        weights = np.where(np.isnan(series), 0, self._weights)
+        ewma = np.where(np.isnan(series), 0, series) @ self._weights / np.maximum(weights.sum(axis=1), 1e-12)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = np.where(std > 0, (last - mean) / std, 0)
+        return last, mean, std, ewma, z
+
+    def detect(self) -> Dict[Tuple[str, str], List[str]]:
+        """Devuelve {(host, servicio): [anomalias]} evaluando todas las series a la vez."""
+        with self._lock:
+            n = len(self._keys)
+            if not n:
+                return {}
+            last, mean, std, ewma, z = self._evaluate()
+            counts = self._counts[:n]
+            upper, lower, warn, zlimit = self._max[:n], self._min[:n], self._warn[:n], self._zlimit[:n]
+            keys = list(self._keys)
+
+        with np.errstate(invalid="ignore"):
+            over = last > upper
+            under = last < lower
+            trend = ~over & (ewma > warn)
+            spike = ~over & ~under & (counts > self.min_samples) & (np.abs(z) > zlimit)
+
+        anomalies: Dict[Tuple[str, str], List[str]] = {}
+        for row in np.flatnonzero(over | under | trend | spike):
+            host_id, service, metric = keys[row]
+            if over[row]:
+                message = f"{metric}={last[row]:g} supera el maximo {upper[row]:g}"
+            elif under[row]:
+                message = f"{metric}={last[row]:g} por debajo del minimo {lower[row]:g}"
+            elif trend[row]:
+                message = f"{metric} en tendencia: EWMA {ewma[row]:.4g} supera {warn[row]:g}"
+            else:
+                message = f"{metric}={last[row]:g} anomalo (z={z[row]:.1f}, media {mean[row]:.4g})"
+            anomalies.setdefault((host_id, service), []).append(message)
+        return anomalies
+
+    def summary(self) -> Dict[str, Dict]:
+        with self._lock:
+            if not self._keys:
+                return {}
+            last, mean, std, ewma, z = self._evaluate()
+            keys = list(self._keys)
+            counts = self._counts[:len(keys)].copy()
+        return {
+            f"{host_id}/{service}/{metric}": {
+                "last": float(last[row]),
+                "mean": round(float(mean[row]), 4),
+                "std": round(float(std[row]), 4),
+                "ewma": round(float(ewma[row]), 4),
+                "samples": int(min(counts[row], self.window))
+            }
+            for row, (host_id, service, metric) in enumerate(keys)
+        }
+
+
+def metric_checks(services: Dict[str, Dict]) -> Dict[str, Dict]:
+    """Convierte los 'metrics' de cada servicio en chequeos extra para el sondeo."""
+    checks = {}
+    for name, cfg in services.items():
+        for metric, rule in cfg.get("metrics", {}).items():
+            checks[f"{name}{METRIC_SEPARATOR}{metric}"] = {"check_command": rule["command"]}
+    return checks
+
+
+def record_metrics(host_id: str, services: Dict[str, Dict], results: Dict[str, Tuple[int, str, int]]):
+    for check in [c for c in results if METRIC_SEPARATOR in c]:
+        code, out, _ = results.pop(check)
+        name, metric = check.split(METRIC_SEPARATOR, 1)
+        match = _NUMBER.search(out)
+        if code != 0 or not match or name not in services:
+            continue
+        metric_store.record((host_id, name, metric), float(match.group()), services[name]["metrics"].get(metric))
+
+
+metric_store = MetricStore(
+    window=config.METRICS_WINDOW,
+    alpha=config.METRICS_EWMA_ALPHA,
+    zscore=config.METRICS_ZSCORE,
+    min_samples=config.METRICS_MIN_SAMPLES
+)
@@ -0,0 +1,104 @@
+import os
+import time
+from typing import Callable, Optional
+
+
+class OutputBuffer:
+    """Acumula la salida de un comando con memoria acotada.
+
+    Conserva los primeros `head_bytes` y un anillo con los ultimos `tail_bytes`;
+    opcionalmente vuelca la salida completa a `spill_path` y reenvia cada linea
+    a `on_line` con un limite de lineas por segundo.
+    """
+
+    def __init__(self, head_bytes: int = 4096, tail_bytes: int = 16384,
+                 on_line: Optional[Callable[[str], None]] = None, lines_per_sec: int = 20,
+                 spill_path: Optional[str] = None, max_line: int = 1024):
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.on_line = on_line
+        self.lines_per_sec = lines_per_sec
+        self.max_line = max_line
+        self.spill_path = spill_path
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+        self._partial = bytearray()
+        self._window_start = 0.0
+        self._window_lines = 0
+        self._suppressed = 0
+        self._spill = None
+        if spill_path:
+            os.makedirs(os.path.dirname(spill_path) or ".", exist_ok=True)
+            self._spill = open(spill_path, "wb")
+
+    def feed(self, data: bytes):
+        if not data:
+            return
+        self.total += len(data)
+        if self._spill:
+            self._spill.write(data)
+        if self.on_line:
+            self._split_lines(data)
+
+        room = self.head_bytes - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+        if data:
+            self.tail += data
+            if len(self.tail) > self.tail_bytes:
+                del self.tail[:len(self.tail) - self.tail_bytes]
+
+    def _split_lines(self, data: bytes):
+        self._partial += data
+        *lines, rest = self._partial.split(b"\n")
+        while len(rest) > self.max_line:
+            lines.append(rest[:self.max_line])
+            rest = rest[self.max_line:]
+        self._partial = bytearray(rest)
+        for line in lines:
+            self._emit(line)
+
+    def _emit(self, line: bytes):
+        text = line.decode(errors="replace").rstrip("\r")
+        if not text.strip():
+            return
+        now = time.monotonic()
+        if now - self._window_start >= 1.0:
+            if self._suppressed:
+                self.on_line(f"... {self._suppressed} lineas omitidas ...")
+            self._window_start = now
+            self._window_lines = 0
+            self._suppressed = 0
+        if self._window_lines < self.lines_per_sec:
+            self._window_lines += 1
+            self.on_line(text)
+        else:
+            self._suppressed += 1
+
+    def close(self):
+        if self.on_line:
+            if self._partial:
+                self._emit(bytes(self._partial))
+                self._partial = bytearray()
+            if self._suppressed:
+                self.on_line(f"... {self._suppressed} lineas omitidas ...")
+                self._suppressed = 0
+        if self._spill:
+            self._spill.close()
+            self._spill = None
+
+    @property
+    def truncated(self) -> bool:
+        return self.total > len(self.head) + len(self.tail)
+
+    def text(self) -> str:
+        head = self.head.decode(errors="replace")
+        if not self.tail:
+            return head
+        tail = self.tail.decode(errors="replace")
+        if self.truncated:
+            omitted = self.total - len(self.head) - len(self.tail)
+            return f"{head}\n... [{omitted} bytes omitidos] ...\n{tail}"
+        return head + tail
@@ -0,0 +1,56 @@
+import re
+import time
+import uuid
+from typing import Dict, Tuple
+from .async_ssh import execute
+from ..core.config import config
+
+PROBE_OUTPUT_LIMIT = 1024 * 1024
+
+
+def build_probe_script(services: Dict[str, Dict], marker: str) -> str:
+    parts = []
+    for i, (name, cfg) in enumerate(services.items()):
+        parts.append(
+            f"echo '{marker}:BEGIN:{i}'; "
+            "__t0=$(date +%s%N); "
+            f"( {cfg['check_command']} ) 2>/dev/null; "
+            "__rc=$?; __t1=$(date +%s%N); "
+            f"echo; echo \"{marker}:END:{i}:$__rc:$(( (__t1 - __t0) / 1000000 ))\""
+        )
+    return "; ".join(parts)
+
+
+def parse_probe_output(services: Dict[str, Dict], output: str, marker: str) -> Dict[str, Tuple[int, str, int]]:
+    names = list(services.keys())
+    results = {name: (-1, "", 0) for name in names}
+    pattern = re.compile(
+        rf"^{re.escape(marker)}:BEGIN:(\d+)\r?\n(.*?)\r?\n?{re.escape(marker)}:END:\1:(-?\d+):(-?\d+)\r?$",
+        re.S | re.M
+    )
+    for match in pattern.finditer(output):
+        index, body, code, duration = match.groups()
+        results[names[int(index)]] = (int(code), body.strip(), int(duration))
+    return results
+
+
+async def probe_services(services: Dict[str, Dict], **target) -> Dict[str, Tuple[int, str, int]]:
+    """Ejecuta los check_command de todos los servicios.
+
+    En modo 'batched' se envia un unico script remoto con delimitadores por
+    servicio (una sola ida y vuelta); devuelve {servicio: (codigo, salida, ms)}.
+    """
+    if not services:
+        return {}
+
+    if config.PROBE_MODE != "batched":
+        results = {}
+        for name, cfg in services.items():
+            start = time.perf_counter()
+            code, out, err = await execute(cfg["check_command"], **target)
+            results[name] = (code, out, int((time.perf_counter() - start) * 1000))
+        return results
+
+    marker = f"__SENTINEL_{uuid.uuid4().hex}"
+    code, out, err = await execute(build_probe_script(services, marker), head_bytes=PROBE_OUTPUT_LIMIT, **target)
+    return parse_probe_output(services, out, marker)
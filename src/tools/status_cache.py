@@ -0,0 +1,73 @@
+import asyncio
+import time
+from typing import Dict, List, Tuple, Union, Optional
+from ..core.config import config
+from ..core.event_bus import log
+from .fleet import fleet, build_status_view
+
+
+class StatusSnapshot:
+    def __init__(self, results: Dict[str, Union[Dict, Exception]]):
+        self.taken_at = time.monotonic()
+        self.results = results
+        self.view, self.failures = build_status_view(results)
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.taken_at
+
+    @property
+    def unreachable(self) -> List[Tuple[str, Exception]]:
+        return [(host_id, r) for host_id, r in self.results.items() if isinstance(r, Exception)]
+
+
+class StatusCache:
+    """Snapshot compartido del estado de la flota con TTL.
+
+    Los refrescos concurrentes se agrupan en un unico sondeo en vuelo
+    (single-flight); cada snapshot nuevo se publica como 'status_update'.
+    Debe usarse desde el bucle de ssh_runtime.
+    """
+
+    def __init__(self, ttl: float = 5):
+        self.ttl = ttl
+        self._snapshot: Optional[StatusSnapshot] = None
+        self._inflight: Optional[asyncio.Task] = None
+        self._hits = 0
+        self._refreshes = 0
+        self._coalesced = 0
+
+    async def _refresh(self) -> StatusSnapshot:
+        self._refreshes += 1
+        snapshot = StatusSnapshot(await fleet.probe_all())
+        self._snapshot = snapshot
+        message = "Error de conexion SSH" if snapshot.unreachable else "Estado de servicios actualizado"
+        log("status_update", message, snapshot.view)
+        return snapshot
+
+    async def get(self, max_age: Optional[float] = None) -> StatusSnapshot:
+        max_age = self.ttl if max_age is None else max_age
+        if self._snapshot and self._snapshot.age <= max_age:
+            self._hits += 1
+            return self._snapshot
+
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.ensure_future(self._refresh())
+        else:
+            self._coalesced += 1
+        return await asyncio.shield(self._inflight)
+
+    def invalidate(self):
+        self._snapshot = None
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "ttl": self.ttl,
+            "hits": self._hits,
+            "refreshes": self._refreshes,
+            "coalesced": self._coalesced,
+            "age": round(self._snapshot.age, 2) if self._snapshot else None
+        }
+
+
+status_cache = StatusCache(ttl=config.STATUS_CACHE_TTL)